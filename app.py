@@ -1,11 +1,80 @@
+import time
+RUN_STARTED = time.perf_counter()  # start of this script run, for the startup profile
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
 import warnings
+import functools
 import hashlib
+import hmac
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 warnings.filterwarnings('ignore')
 
+# Startup profile mode: every phase of a script run (imports, login page, data, dashboard)
+# is timed, and the first login and dashboard runs of each process are reported to stderr
+STARTUP_PROFILE = os.environ.get('DASHBOARD_STARTUP_PROFILE', '0') not in ('', '0')
+
+def process_uptime():
+    """Seconds since this process started (Linux /proc), or None where unavailable"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupTimer:
+    """Wall-clock phases of one script run, for the startup profile mode"""
+
+    def __init__(self, start):
+        self.start = self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def import_module(self, name):
+        """Import `name`, timed as a phase of its own"""
+        module = importlib.import_module(name)
+        self.mark(f"import {name}")
+        return module
+
+    def report(self, kind, reported):
+        """Print the breakdown the first time a run of `kind` completes in this process"""
+        if not STARTUP_PROFILE or kind in reported:
+            return
+        reported.add(kind)
+        uptime = process_uptime()
+        lines = [f"startup profile: first {kind} run took {(self.last - self.start) * 1000:,.1f} ms"
+                 + (f", {uptime:,.2f} s after process start" if uptime is not None else "")]
+        lines += [f"  {phase:<32}{seconds * 1000:10.1f} ms" for phase, seconds in self.phases]
+        print('\n'.join(lines), file=sys.stderr, flush=True)
+
+@st.cache_resource
+def startup_runs_reported():
+    """Kinds of run (login, dashboard) already reported by this process"""
+    return set()
+
+_startup = StartupTimer(RUN_STARTED)
+_startup.mark('streamlit and stdlib imports')
+
 # Configure page
 st.set_page_config(
     page_title="Heart Disease Analysis Dashboard",
@@ -16,14 +85,56 @@ st.set_page_config(
 
 # Password configuration - Change these values for your security
 CORRECT_PASSWORD = "heartdisease"  # Change this to your desired password
-HASHED_PASSWORD = hashlib.sha256(CORRECT_PASSWORD.encode()).hexdigest()
+
+# Static markup of the login page (module constants: Streamlit reuses the compiled script,
+# so they are built once per process)
+LOGIN_HEADER_HTML = """
+    <div style="text-align: center; padding: 2rem;">
+        <h1 style="color: #e74c3c; font-size: 3rem; margin-bottom: 1rem;">🔒 Secure Access</h1>
+        <h2 style="color: #2c3e50; font-size: 1.5rem; margin-bottom: 2rem;">Heart Disease Analysis Dashboard</h2>
+        <p style="color: #7f8c8d; font-size: 1.1rem;">Please enter the password to access the medical dashboard</p>
+    </div>
+    """
+LOGIN_ABOUT_HTML = """
+    <div style="text-align: center; margin-top: 3rem; padding: 2rem; background-color: #f8f9fa; border-radius: 10px;">
+        <h3 style="color: #2c3e50; margin-bottom: 1rem;">🏥 About This Dashboard</h3>
+        <p style="color: #6c757d; font-size: 1rem; line-height: 1.6;">
+            This dashboard provides comprehensive analysis of heart disease data including:
+        </p>
+        <div style="display: flex; justify-content: space-around; margin-top: 1.5rem; flex-wrap: wrap;color: black;">
+            <div style="margin: 0.5rem;">
+                <span style="font-size: 1.5rem;">👥</span><br>
+                <strong>Demographics</strong>
+            </div>
+            <div style="margin: 0.5rem;">
+                <span style="font-size: 1.5rem;">🏥</span><br>
+                <strong>Clinical Data</strong>
+            </div>
+            <div style="margin: 0.5rem;">
+                <span style="font-size: 1.5rem;">⚠️</span><br>
+                <strong>Risk Factors</strong>
+            </div>
+            <div style="margin: 0.5rem;">
+                <span style="font-size: 1.5rem;">💡</span><br>
+                <strong>Insights</strong>
+            </div>
+        </div>
+    </div>
+    """
+LOGIN_FOOTER_HTML = """
+    <div style="text-align: center; margin-top: 2rem; padding: 1rem; color: #adb5bd;">
+        <small>🔐 Secure Medical Data Analysis • MSBA 382 Project</small>
+    </div>
+    """
 
 def check_password():
     """Returns `True` if the user has entered the correct password."""
     
     def password_entered():
         """Checks whether a password entered by the user is correct."""
-        if hashlib.sha256(st.session_state["password"].encode()).hexdigest() == HASHED_PASSWORD:
+        # Hashed only when a password is submitted, never on a plain run of the script
+        entered = hashlib.sha256(st.session_state["password"].encode()).digest()
+        if hmac.compare_digest(entered, hashlib.sha256(CORRECT_PASSWORD.encode()).digest()):
             st.session_state["password_correct"] = True
             del st.session_state["password"]  # Don't store the password
         else:
@@ -34,13 +145,7 @@ def check_password():
         return True
 
     # Show input for password
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem;">
-        <h1 style="color: #e74c3c; font-size: 3rem; margin-bottom: 1rem;">🔒 Secure Access</h1>
-        <h2 style="color: #2c3e50; font-size: 1.5rem; margin-bottom: 2rem;">Heart Disease Analysis Dashboard</h2>
-        <p style="color: #7f8c8d; font-size: 1.1rem;">Please enter the password to access the medical dashboard</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(LOGIN_HEADER_HTML, unsafe_allow_html=True)
     
     # Center the password input
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -58,42 +163,26 @@ def check_password():
                 st.error("❌ Incorrect password. Please try again.")
             
     # Add some styling and information
-    st.markdown("""
-    <div style="text-align: center; margin-top: 3rem; padding: 2rem; background-color: #f8f9fa; border-radius: 10px;">
-        <h3 style="color: #2c3e50; margin-bottom: 1rem;">🏥 About This Dashboard</h3>
-        <p style="color: #6c757d; font-size: 1rem; line-height: 1.6;">
-            This dashboard provides comprehensive analysis of heart disease data including:
-        </p>
-        <div style="display: flex; justify-content: space-around; margin-top: 1.5rem; flex-wrap: wrap;color: black;">
-            <div style="margin: 0.5rem;">
-                <span style="font-size: 1.5rem;">👥</span><br>
-                <strong>Demographics</strong>
-            </div>
-            <div style="margin: 0.5rem;">
-                <span style="font-size: 1.5rem;">🏥</span><br>
-                <strong>Clinical Data</strong>
-            </div>
-            <div style="margin: 0.5rem;">
-                <span style="font-size: 1.5rem;">⚠️</span><br>
-                <strong>Risk Factors</strong>
-            </div>
-            <div style="margin: 0.5rem;">
-                <span style="font-size: 1.5rem;">💡</span><br>
-                <strong>Insights</strong>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(LOGIN_ABOUT_HTML, unsafe_allow_html=True)
     
     # Footer
-    st.markdown("""
-    <div style="text-align: center; margin-top: 2rem; padding: 1rem; color: #adb5bd;">
-        <small>🔐 Secure Medical Data Analysis • MSBA 382 Project</small>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(LOGIN_FOOTER_HTML, unsafe_allow_html=True)
     
     return False
 
+# Unauthenticated runs paint the login page first: numpy, pandas and Plotly Express are
+# imported after it has been sent. The run then still defines the module and kicks off the
+# process-wide background load of the data (start_background_load), so the data is ready by
+# the time a password is accepted, and stops short of the dashboard (see the end of the
+# script). Imported as a module, e.g. through headless.py, the app is defined in full.
+LOGIN_ONLY = __name__ == "__main__" and not check_password()
+if LOGIN_ONLY:
+    _startup.mark('login page')
+
+np = _startup.import_module('numpy')
+pd = _startup.import_module('pandas')
+px = _startup.import_module('plotly.express')
+
 # Define medical-themed color palettes
 MEDICAL_COLORS = {
     'primary': '#e74c3c',      # Red - primary medical color
@@ -117,8 +206,8 @@ CHEST_PAIN_COLORS = [MEDICAL_COLORS['success'], MEDICAL_COLORS['warning'],
                     MEDICAL_COLORS['coral'], MEDICAL_COLORS['primary']]
 RISK_GRADIENT = ['#27ae60', '#f39c12', '#e74c3c']  # Green to Orange to Red
 
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS for better styling (emitted by main once the user is logged in)
+PAGE_STYLE = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -194,14 +283,345 @@ st.markdown("""
         background-color: #c0392b;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+MAIN_HEADER_HTML = '''
+        <div class="main-header">
+            <span style="color:white;">MSBA 382 Project</span><br>🫀 Heart Disease Analysis Dashboard
+        </div>
+    '''
+
+# Age group bins shared by load_data and the count cube
+AGE_GROUP_BINS = [0, 40, 50, 60, 70, 100]
+AGE_GROUP_LABELS = ['<40', '40-49', '50-59', '60-69', '70+']
+
+# Display labels that clean_data adds as categoricals (chart colors and legends), so no
+# rerun has to copy the frame to derive them
+HEART_DISEASE_LABELS = {0: 'No Heart Disease', 1: 'Heart Disease'}
+EXANG_LABELS = {0: 'No', 1: 'Yes'}
+FBS_LABELS = {1: '>120 mg/dl', 0: '≤120 mg/dl'}
+DISPLAY_LABEL_COLUMNS = ['heart_disease_label', 'exang_label', 'fbs_label']
+
+# Dimensions held by the count cube (age is the leading, prefix-summed axis)
+CUBE_DIMENSIONS = ['sex', 'dataset', 'cp', 'chol_category', 'bp_category', 'fbs', 'exang', 'has_heart_disease']
+# Columns compute_aggregates reads
+AGGREGATE_COLUMNS = ['age', 'age_group'] + CUBE_DIMENSIONS
+
+# Store the cleaned frame with categorical / downcast dtypes (see compact_frame)
+COMPACT_DTYPES = True
+QUALITY_FLAG_COLUMNS = ['low_hr_flag', 'high_chol_flag', 'high_bp_flag']
+
+# Categorical columns with per-value row bitmaps in the filter index
+FILTER_INDEX_COLUMNS = ['sex', 'dataset', 'cp', 'chol_category', 'bp_category', 'hr_category', 'fbs', 'exang']
+
+# Faceted sidebar filters (column -> label): multi-selects showing each option's live count,
+# answered from one integer code per row for its combination of facet values
+FACET_COLUMNS = {
+    'cp': 'Chest Pain Type',
+    'chol_category': 'Cholesterol',
+    'bp_category': 'Blood Pressure',
+    'hr_category': 'Max Heart Rate',
+    'exang': 'Exercise-Induced Angina',
+    'fbs': 'Fasting Blood Sugar',
+    'low_hr_flag': 'Flag: Low Heart Rate (<80)',
+    'high_chol_flag': 'Flag: High Cholesterol (>400)',
+    'high_bp_flag': 'Flag: High Blood Pressure (>180)',
+}
+
+# Process-wide result cache limits (per-view aggregates and serialized figures);
+# sized to hold every warmed-up view (see POPULAR_AGE_RANGES)
+RESULT_CACHE_MAX_ENTRIES = 1024
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Source data and the on-disk cache of its cleaned, columnar form (None disables the cache)
+DATA_PATH = 'heart_disease_uci.csv'
+COLUMNAR_CACHE_DIR = '.data_cache'
+# Size cap of that cache (columnar artifacts, shard statistics and SQLite databases): past it
+# the least recently used entries are evicted, so a source that keeps being replaced or
+# appended to does not fill the disk with artifacts of its old versions
+COLUMNAR_CACHE_MAX_BYTES = int(os.environ.get('DASHBOARD_CACHE_MAX_BYTES', 4 * 1024 ** 3))
+# Bump whenever clean_data or compact_frame change what they produce, or what the cached
+# SQLite database stores alongside the rows
+CLEANING_VERSION = 6
+
+# Cleaning pipeline columns: dropped as mostly missing, median-imputed, mode-imputed
+HIGH_MISSING_COLUMNS = ['ca', 'thal', 'slope']
+NUMERICAL_IMPUTE_COLUMNS = ['chol', 'trestbps', 'thalch', 'oldpeak']
+CATEGORICAL_IMPUTE_COLUMNS = ['cp', 'fbs', 'restecg', 'exang']
+
+# DATA_PATH may also be a directory of per-cohort CSV shards (one extract per site); shards
+# are scanned and cleaned in parallel across up to SHARD_WORKERS processes
+SHARD_WORKERS = os.cpu_count() or 1
+
+# CSVs larger than this are cleaned chunk by chunk (see load_data_streaming)
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
+STREAM_CHUNK_ROWS = 250_000
+
+# Where the dashboard queries the cleaned data: 'memory' (frame, count cube and filter index
+# held by every worker) or 'sqlite' (one on-disk database next to the columnar artifact,
+# queried with GROUP BY over a pool of read-only connections)
+DATA_BACKEND = os.environ.get('DASHBOARD_BACKEND', 'memory')
+SQLITE_POOL_SIZE = 4
+SQLITE_INDEX_COLUMNS = ['age', 'sex', 'dataset', 'cp']
+
+# How often the background watcher looks at the source (sizes and modification times, then a
+# content hash when those moved), and how far (relative) a median may move from its
+# imputation value before appended rows trigger a full recompute
+SOURCE_CHECK_SECONDS = float(os.environ.get('DASHBOARD_SOURCE_CHECK_SECONDS', 5))
+IMPUTATION_DRIFT_TOLERANCE = 0.05
+
+# Views precomputed in the background for each data version: every gender x dataset
+# combination at the full age range and at each of these ranges
+POPULAR_AGE_RANGES = [(40, 60), (50, 70), (60, 80)]
+WARMUP_WORKERS = 2
+
+# Progressive rendering on large extracts: a view whose exact answer scans rows (facet
+# selections, the SQLite backend) first renders from a stratified sample of about
+# SAMPLE_ROWS rows, while a background worker computes it exactly and the page polls for it
+PROGRESSIVE_MIN_ROWS = int(os.environ.get('DASHBOARD_PROGRESSIVE_MIN_ROWS', 1_000_000))
+SAMPLE_ROWS = 20_000
+SAMPLE_STRATA = ['dataset', 'sex', 'age_group']
+EXACT_WORKERS = 1
+PROGRESSIVE_POLL_SECONDS = 0.25
+
+# Continuous variables in the distribution section (column -> axis label) and their bin count
+DISTRIBUTION_COLUMNS = {
+    'age': 'Age (years)',
+    'chol': 'Serum Cholesterol (mg/dl)',
+    'trestbps': 'Resting Blood Pressure (mm Hg)',
+    'thalch': 'Maximum Heart Rate (bpm)',
+    'oldpeak': 'ST Depression (oldpeak)',
+}
+DISTRIBUTION_BINS = 30
+
+# Percentile bootstrap behind the confidence intervals on risk percentages
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+
+# Association section: the categorical clinical variables below plus the DISTRIBUTION_COLUMNS
+# numerics, each against heart disease and against each other
+ASSOCIATION_CATEGORICAL = {
+    'has_heart_disease': 'Heart Disease',
+    'sex': 'Sex',
+    'dataset': 'Dataset',
+    'cp': 'Chest Pain Type',
+    'fbs': 'Fasting Blood Sugar',
+    'restecg': 'Resting ECG',
+    'exang': 'Exercise-Induced Angina',
+}
+ASSOCIATION_BINS = 10  # quantile bins per numeric in its contingency tables
+ASSOCIATION_CHUNK_ROWS = 32_768
+# Upper bounds of the words used for an association's strength in the insights
+ASSOCIATION_STRENGTHS = [(0.1, 'negligible'), (0.3, 'weak'), (0.5, 'moderate'), (np.inf, 'strong')]
+
+# Logistic-regression risk model: standardized numeric features, one-hot categorical
+# features (restecg is left out: the cleaning mapping leaves it empty) and the L2 penalty
+MODEL_NUMERIC_FEATURES = ['age', 'trestbps', 'chol', 'thalch', 'oldpeak']
+MODEL_CATEGORICAL_FEATURES = ['sex', 'cp', 'fbs', 'exang']
+MODEL_L2 = 1.0
+MODEL_MAX_ITERATIONS = 25
+
+# Section-local choices for drawing the outcome bars (label -> Plotly barmode)
+BAR_MODES = {'Stacked': 'relative', 'Grouped': 'group'}
+
+# Opt-in hot-path profiling: timings per span, a sidebar debug panel and a metrics file
+# (Prometheus text format, or JSON lines when the path ends in .jsonl)
+PROFILING_ENABLED = os.environ.get('DASHBOARD_PROFILE', '0') not in ('', '0')
+PROFILE_ALLOCATIONS = os.environ.get('DASHBOARD_PROFILE_ALLOCATIONS', '0') not in ('', '0')
+PROFILE_EXPORT_PATH = os.environ.get('DASHBOARD_PROFILE_EXPORT', 'dashboard_metrics.prom')
+PROFILE_WINDOW = 1000  # recent samples per span used for percentiles
+
+class Profiler:
+    """Wall time, rows processed and traced allocations of named code paths
+
+    Allocations are the peak tracemalloc-traced memory above the span's starting point.
+    tracemalloc is process-wide, so spans overlapping across sessions see each other's
+    allocations.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW, trace_allocations=PROFILE_ALLOCATIONS):
+        self.window = window
+        self.trace_allocations = trace_allocations
+        self._samples = {}  # span -> deque of (seconds, rows, allocated bytes)
+        self._totals = {}   # span -> [calls, seconds, rows]
+        self._pending = []  # finished spans not yet written to a JSON lines export
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name, rows=None):
+        """Time the enclosed block; assign record['rows'] inside it when the count comes late"""
+        record = {'rows': rows, 'child_peak': 0}
+        stack = self._local.__dict__.setdefault('stack', [])
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:  # the parent's peak so far, before this span resets it
+                stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+            record['start_bytes'] = current
+            tracemalloc.reset_peak()
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            allocated = None
+            if self.trace_allocations:
+                peak = max(tracemalloc.get_traced_memory()[1], record['child_peak'])
+                allocated = max(peak - record['start_bytes'], 0)
+                if stack:
+                    stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak)
+            record['allocated'] = allocated
+            self._record(name, seconds, record['rows'], allocated)
+
+    def _record(self, name, seconds, rows, allocated):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append((seconds, rows, allocated))
+            totals = self._totals.setdefault(name, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += rows or 0
+            self._pending.append({'ts': time.time(), 'span': name, 'seconds': round(seconds, 6),
+                                  'rows': rows, 'allocated_bytes': allocated})
+
+    def summary(self):
+        """Per-span call counts, latency percentiles and allocations over the recent window"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = {name: list(values) for name, values in self._totals.items()}
+        rows = []
+        for name, values in samples.items():
+            seconds = np.array([value[0] for value in values]) * 1000
+            allocated = [value[2] for value in values if value[2] is not None]
+            rows.append({
+                'span': name,
+                'calls': totals[name][0],
+                'p50_ms': np.percentile(seconds, 50),
+                'p95_ms': np.percentile(seconds, 95),
+                'max_ms': seconds.max(),
+                'last_rows': values[-1][1],
+                'max_alloc_kib': max(allocated) / 1024 if allocated else None,
+            })
+        return pd.DataFrame(rows, columns=['span', 'calls', 'p50_ms', 'p95_ms', 'max_ms', 'last_rows', 'max_alloc_kib'])
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format (summary quantiles over the window)"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = {name: list(values) for name, values in self._totals.items()}
+        lines = ['# HELP dashboard_span_seconds Wall time of instrumented dashboard code paths',
+                 '# TYPE dashboard_span_seconds summary']
+        for name, values in samples.items():
+            seconds = np.array([value[0] for value in values])
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(f'dashboard_span_seconds{{span="{name}",quantile="{quantile}"}} {np.quantile(seconds, quantile):.6f}')
+            lines.append(f'dashboard_span_seconds_sum{{span="{name}"}} {totals[name][1]:.6f}')
+            lines.append(f'dashboard_span_seconds_count{{span="{name}"}} {totals[name][0]}')
+        lines += ['# HELP dashboard_span_rows_total Rows processed by instrumented code paths',
+                  '# TYPE dashboard_span_rows_total counter']
+        lines += [f'dashboard_span_rows_total{{span="{name}"}} {values[2]}' for name, values in totals.items()]
+        if self.trace_allocations:
+            lines += ['# HELP dashboard_span_allocated_bytes Largest traced allocation peak over the window',
+                      '# TYPE dashboard_span_allocated_bytes gauge']
+            for name, values in samples.items():
+                allocated = [value[2] for value in values if value[2] is not None]
+                lines.append(f'dashboard_span_allocated_bytes{{span="{name}"}} {max(allocated, default=0)}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """Append finished spans to a JSON lines log, or rewrite a Prometheus textfile atomically"""
+        if path.endswith('.jsonl'):
+            with self._lock:
+                pending, self._pending = self._pending, []
+            with open(path, 'a') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in pending)
+        else:
+            with self._lock:
+                self._pending = []
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, 'w') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+
+@st.cache_resource
+def get_profiler():
+    """Process-wide profiler shared by every session"""
+    return Profiler()
+
+def profiled(name=None, rows=None):
+    """Record each call as a profiler span when profiling is enabled
+
+    `rows(result)` gives the number of rows the call processed.
+    """
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILING_ENABLED:
+                return func(*args, **kwargs)
+            with get_profiler().span(span_name) as record:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    record['rows'] = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+def profile_span(name, rows=None):
+    """Profiler span for an inline block (a no-op context unless profiling is enabled)"""
+    if not PROFILING_ENABLED:
+        return nullcontext({})
+    return get_profiler().span(name, rows)
+
+@profiled(rows=len)
+def load_data(datasets=None):
+    """Load and comprehensively clean the heart disease dataset (optionally only some cohorts)"""
+    # Cached per version of the source, so a changed CSV is never served from the cache
+    return _load_data_version(DATA_PATH, _source_signature(DATA_PATH), datasets)
+
+@st.cache_data(max_entries=4)
+def _load_data_version(csv_path, signature, datasets=None):
+    """Cleaned frame of one version (signature) of a source"""
+    return load_cleaned_data(csv_path, datasets)[0]
+
+@profiled(rows=lambda result: len(result[0]))
+def load_cleaned_data(csv_path, datasets=None):
+    """Cleaned frame of a CSV (or shard directory) plus its imputation statistics
+
+    With `datasets`, only those cohorts are returned; a shard directory then reads just
+    their shards (see load_shards).
+    """
+    if os.path.isdir(csv_path):
+        return load_shards(csv_path, datasets)
+    if datasets is not None:
+        df, statistics = load_cleaned_data(csv_path)
+        return df[df['dataset'].isin(datasets)].reset_index(drop=True), statistics
+
+    # Reuse the cleaned columnar artifact for this CSV when one exists
+    artifact_path = columnar_artifact_path(csv_path) if COLUMNAR_CACHE_DIR else None
+    if artifact_path and os.path.isdir(artifact_path):
+        return read_columnar_artifact(artifact_path), read_fill_statistics(artifact_path)
+
+    # Very large exports are cleaned in bounded memory straight into the artifact
+    if artifact_path and os.path.getsize(csv_path) > STREAMING_THRESHOLD_BYTES:
+        return load_data_streaming(csv_path), read_fill_statistics(artifact_path)
 
-@st.cache_data
-def load_data():
-    """Load and comprehensively clean the heart disease dataset"""
     # Load the dataset
-    df = pd.read_csv('heart_disease_uci.csv')
+    df_raw = prepare_raw_data(pd.read_csv(csv_path))
+    statistics = compute_fill_statistics(df_raw)
+    df_cleaned = clean_data(df_raw, statistics['fill_values'])
+    
+    if artifact_path:
+        write_columnar_artifact(df_cleaned, artifact_path, statistics)
+    
+    return df_cleaned, statistics
 
+def prepare_raw_data(df):
+    """Normalize a raw frame before imputation: column names, impossible values, sparse columns"""
     # Clean column names
     df.columns = df.columns.str.strip()
     
@@ -211,31 +631,60 @@ def load_data():
     
     
     # Drop variables with >40% missing data (ca, thal, slope)
-    high_missing_vars = ['ca', 'thal', 'slope']
-    vars_to_drop = [var for var in high_missing_vars if var in df.columns]
-    df_cleaned = df.drop(columns=vars_to_drop)
-    
-    # STEP 4: Handle Moderate Missing Values with Imputation
+    vars_to_drop = [var for var in HIGH_MISSING_COLUMNS if var in df.columns]
+    return df.drop(columns=vars_to_drop)
+
+def compute_fill_values(df):
+    """Imputation values of a prepared frame: medians for numerical, modes for categorical columns"""
+    fill_values = {}
     # Numerical variables - use median imputation
-    numerical_cols = ['chol', 'trestbps', 'thalch', 'oldpeak']
-    for col in numerical_cols:
-        if col in df_cleaned.columns and df_cleaned[col].isnull().any():
-            median_val = df_cleaned[col].median()
-            df_cleaned[col].fillna(median_val, inplace=True)
+    for col in NUMERICAL_IMPUTE_COLUMNS:
+        if col in df.columns:
+            fill_values[col] = df[col].median()
     
     # Categorical variables - use mode imputation
-    categorical_cols = ['cp', 'fbs', 'restecg', 'exang']
-    for col in categorical_cols:
+    for col in CATEGORICAL_IMPUTE_COLUMNS:
+        if col in df.columns:
+            mode = df[col].mode()
+            fill_values[col] = mode[0] if not mode.empty else 0
+    return fill_values
+
+def compute_fill_statistics(df):
+    """Imputation values of a prepared frame plus the mergeable sketches and counters behind them
+
+    The sketches let appended rows be folded in later to check whether the medians and
+    modes have drifted away from the values used for imputation.
+    """
+    sketches = {col: QuantileSketch() for col in NUMERICAL_IMPUTE_COLUMNS if col in df.columns}
+    counters = {col: FrequencyCounter() for col in CATEGORICAL_IMPUTE_COLUMNS if col in df.columns}
+    for col, sketch in sketches.items():
+        sketch.update(df[col].to_numpy(dtype=np.float64))
+    for col, counter in counters.items():
+        counter.update(df[col])
+    return {'fill_values': compute_fill_values(df), 'sketches': sketches, 'counters': counters}
+
+def clean_data(df, fill_values=None):
+    """Apply the cleaning pipeline to a raw heart disease frame
+
+    Missing values are imputed with `fill_values` ({column: value}) when given, so chunks of
+    a larger file can share dataset-wide medians and modes; otherwise with `df`'s own.
+    """
+    df_cleaned = prepare_raw_data(df)
+    
+    # STEP 4: Handle Moderate Missing Values with Imputation
+    if fill_values is None:
+        fill_values = compute_fill_values(df_cleaned)
+    for col, value in fill_values.items():
         if col in df_cleaned.columns and df_cleaned[col].isnull().any():
-            mode_val = df_cleaned[col].mode()[0] if not df_cleaned[col].mode().empty else 0
-            df_cleaned[col].fillna(mode_val, inplace=True)
+            df_cleaned[col] = df_cleaned[col].fillna(value)
     
     # STEP 5: Create Binary Target Variable (keep as int for computations)
     df_cleaned['has_heart_disease'] = (df_cleaned['num'] > 0).astype(int)
 
     # Map fasting blood sugar
     if 'fbs' in df_cleaned.columns:
-        df_cleaned['fbs'] = df_cleaned['fbs'].map({1: '>120 mg/dl', 0: '≤120 mg/dl'})
+        # Through float so bool, object and integer encodings of the flag all match the keys
+        df_cleaned['fbs'] = df_cleaned['fbs'].astype(float).map(FBS_LABELS)
     
     # Map resting ECG results
     if 'restecg' in df_cleaned.columns:
@@ -245,13 +694,17 @@ def load_data():
             2: 'LV Hypertrophy'
         }
         df_cleaned['restecg'] = df_cleaned['restecg'].map(restecg_mapping)
+
+    # STEP 7: Display labels for chart colors, computed once here rather than per rerun
+    for column, labels in display_labels(df_cleaned).items():
+        df_cleaned[column] = labels
     
     
     # STEP 8: Create Derived Variables for Analysis
     # Create age groups
     df_cleaned['age_group'] = pd.cut(df_cleaned['age'], 
-                                   bins=[0, 40, 50, 60, 70, 100], 
-                                   labels=['<40', '40-49', '50-59', '60-69', '70+'])
+                                   bins=AGE_GROUP_BINS, 
+                                   labels=AGE_GROUP_LABELS)
     
     # Create cholesterol categories
     df_cleaned['chol_category'] = pd.cut(df_cleaned['chol'], 
@@ -274,347 +727,2866 @@ def load_data():
     df_cleaned['high_chol_flag'] = (df_cleaned['chol'] > 400).astype(int)
     df_cleaned['high_bp_flag'] = (df_cleaned['trestbps'] > 180).astype(int)
     
+    # STEP 10: Compact Storage Layout
+    if COMPACT_DTYPES:
+        df_cleaned = compact_frame(df_cleaned)
+    
     return df_cleaned
 
-def add_display_columns(df):
-    """Add string versions of categorical columns for proper color mapping"""
-    df_display = df.copy()
-    
-    # Create string version of heart disease for color mapping
-    df_display['heart_disease_label'] = df_display['has_heart_disease'].map({
-        0: 'No Heart Disease', 
-        1: 'Heart Disease'
-    })
-    
-    # Create string version of exang for color mapping
-    df_display['exang_label'] = df_display['exang'].map({
-        False: 'No', 
-        True: 'Yes'
+def compact_frame(df):
+    """Store strings as categoricals, flags as bools and downcast numerics to the smallest dtype"""
+    df_compact = pd.DataFrame(index=df.index)
+    for column in df.columns:
+        series = df[column]
+        if column in QUALITY_FLAG_COLUMNS:
+            df_compact[column] = series.astype(bool)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            df_compact[column] = series
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df_compact[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype):
+            # Clinical measurements carry at most one decimal, well within float32 precision
+            df_compact[column] = series.astype(np.float32)
+        else:
+            df_compact[column] = series.astype('category')
+    return df_compact
+
+def memory_report(df, *chunks):
+    """Per-column dtype and memory footprint (bytes) of a frame (and its appended chunks), largest first"""
+    usage = sum((chunk.memory_usage(deep=True, index=False) for chunk in chunks),
+                df.memory_usage(deep=True, index=False))
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[column].dtype) for column in usage.index],
+        'bytes': usage.to_numpy(),
     })
-    
-    # Create string version of fbs for color mapping (if it's still numeric)
-    if df_display['fbs'].dtype in ['int64', 'float64']:
-        df_display['fbs_label'] = df_display['fbs'].map({
-            0: '≤120 mg/dl', 
-            1: '>120 mg/dl'
-        })
-    else:
-        df_display['fbs_label'] = df_display['fbs']
-    
-    return df_display
+    return report.sort_values('bytes', ascending=False).reset_index(drop=True)
 
-def create_overview_metrics(df):
-    """Create overview metrics cards with icons"""
-    col1, col2, col3, col4 = st.columns(4)
+@st.cache_data
+def load_memory_report(version):
+    """Memory report of the cleaned dataset as served to the dashboard (per data version)"""
+    return memory_report(*get_data_store().state['frames'])
 
-    with col1:
-        st.markdown(f'''
-        <div class="metric-card">
-            <div class="metric-value">{len(df):,}</div>
-            <div class="metric-label">👥 Total Patients</div>
-        </div>
-        ''', unsafe_allow_html=True)
+def _file_digest(path):
+    """SHA-256 of a file's contents, hashed once per (size, modification time) of the file"""
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_size, stat.st_mtime_ns)
 
-    with col2:
-        heart_disease_count = df['has_heart_disease'].sum()
-        heart_disease_rate = (heart_disease_count / len(df)) * 100
-        st.markdown(f'''
-        <div class="metric-card">
-            <div class="metric-value">{heart_disease_count:,}</div>
-            <div class="metric-label">🫀 Heart Cases ({heart_disease_rate:.1f}%)</div>
-        </div>
-        ''', unsafe_allow_html=True)
+@functools.lru_cache(maxsize=64)
+def _hash_file(path, size, mtime_ns):
+    """SHA-256 of a file's contents, read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
-    with col3:
-        avg_age = df['age'].mean()
-        st.markdown(f'''
-        <div class="metric-card">
-            <div class="metric-value">{avg_age:.1f}</div>
-            <div class="metric-label">📅 Avg Age (years)</div>
-        </div>
-        ''', unsafe_allow_html=True)
+def columnar_artifact_path(csv_path):
+    """Artifact directory keyed by the CSV contents and the cleaning code version"""
+    layout = 'compact' if COMPACT_DTYPES else 'full'
+    key = f"{_file_digest(csv_path)[:32]}-v{CLEANING_VERSION}-{layout}"
+    return os.path.join(COLUMNAR_CACHE_DIR, key)
 
-    with col4:
-        male_count = (df['sex'] == 'Male').sum()
-        male_percentage = (male_count / len(df)) * 100
-        st.markdown(f'''
-        <div class="metric-card">
-            <div class="metric-value">{male_count:,}</div>
-            <div class="metric-label">👨 Male Patients ({male_percentage:.1f}%)</div>
-        </div>
-        ''', unsafe_allow_html=True)
+def _cache_entry_size(path):
+    """Bytes on disk of one cache entry (an artifact directory or a single file)"""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
 
-def create_demographic_analysis(df):
-    """Create demographic analysis visualizations"""
-    st.markdown('<div class="section-header">👥 Demographic Analysis</div>', unsafe_allow_html=True)
-    
-    # Add display columns for proper color mapping
-    df_display = add_display_columns(df)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Heart disease distribution by age group with themed colors
-        age_disease = df_display.groupby(['age_group', 'heart_disease_label']).size().reset_index(name='count')
-        
-        # Calculate percentages for each age group
-        age_totals = df_display.groupby('age_group').size().reset_index(name='total')
-        age_disease = age_disease.merge(age_totals, on='age_group')
-        age_disease['percentage'] = (age_disease['count'] / age_disease['total'] * 100).round(1)
-        
-        fig = px.bar(age_disease, x='age_group', y='count', color='heart_disease_label',
-                    title='Heart Disease Distribution by Age Group',
-                    labels={'age_group': 'Age Group', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
-                    color_discrete_map=HEART_DISEASE_COLORS,
-                    text='percentage')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        # Gender distribution by heart disease with custom colors
-        gender_disease = df_display.groupby(['sex', 'heart_disease_label']).size().reset_index(name='count')
-        
-        # Calculate percentages for each gender
-        gender_totals = df_display.groupby('sex').size().reset_index(name='total')
-        gender_disease = gender_disease.merge(gender_totals, on='sex')
-        gender_disease['percentage'] = (gender_disease['count'] / gender_disease['total'] * 100).round(1)
-        
-        # Create bar chart with themed colors
-        fig = px.bar(gender_disease, x='sex', y='count', color='heart_disease_label',
-                    title='Heart Disease Distribution by Gender',
-                    labels={'heart_disease_label': 'Heart Disease', 'count': 'Number of Patients'},
-                    color_discrete_map=HEART_DISEASE_COLORS,
-                    text='percentage')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+def touch_cache_entry(path):
+    """Mark a cache entry as just used (eviction goes by modification time)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
 
-def create_clinical_analysis(df):
-    """Create clinical parameters analysis"""
-    st.markdown('<div class="section-header">🏥 Clinical Parameters Analysis</div>', unsafe_allow_html=True)
+def prune_artifact_cache(keep):
+    """Evict least recently used cache entries until the cache fits COLUMNAR_CACHE_MAX_BYTES
 
-    # Add display columns for proper color mapping
-    df_display = add_display_columns(df)
-    
-    # First row - Chest Pain and Cholesterol Box Plot
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Chest pain analysis with varied colors
-        cp_disease = df_display.groupby(['cp', 'heart_disease_label']).size().reset_index(name='count')
-        
-        # Calculate percentages for each chest pain type
-        cp_totals = df_display.groupby('cp').size().reset_index(name='total')
-        cp_disease = cp_disease.merge(cp_totals, on='cp')
-        cp_disease['percentage'] = (cp_disease['count'] / cp_disease['total'] * 100).round(1)
-        
-        fig = px.bar(cp_disease, x='cp', y='count', color='heart_disease_label',
-                    title='Heart Disease Distribution by Chest Pain Type',
-                    labels={'cp': 'Chest Pain Type', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
-                    color_discrete_map=HEART_DISEASE_COLORS,
-                    text='percentage')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_xaxes(tickangle=45)
-        fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        # Cholesterol categories by heart disease with purple theme
-        chol_disease = df_display.groupby(['chol_category', 'heart_disease_label']).size().reset_index(name='count')
-        
-        # Calculate percentages for each cholesterol category
-        chol_totals = df_display.groupby('chol_category').size().reset_index(name='total')
-        chol_disease = chol_disease.merge(chol_totals, on='chol_category')
-        chol_disease['percentage'] = (chol_disease['count'] / chol_disease['total'] * 100).round(1)
-        
-        fig = px.bar(chol_disease, x='chol_category', y='count', color='heart_disease_label',
-                    title='Heart Disease Distribution by Cholesterol Category',
-                    labels={'chol_category': 'Cholesterol Category', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
-                    color_discrete_map=HEART_DISEASE_COLORS,
-                    text='percentage')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_xaxes(tickangle=45)
-        fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+    `keep` (the entry just written) and writes still in progress are never evicted. A
+    process still serving an evicted artifact or database keeps its open files and maps.
+    """
+    keep = os.path.abspath(keep)
+    try:
+        total = _cache_entry_size(keep)
+    except OSError:
+        return  # already evicted by another replica or thread
+    entries = []
+    for entry in os.scandir(COLUMNAR_CACHE_DIR):
+        if '.tmp-' in entry.name or os.path.abspath(entry.path) == keep:
+            continue
+        try:
+            size = _cache_entry_size(entry.path)
+            entries.append((entry.stat().st_mtime, size, entry.path))
+        except OSError:
+            continue  # evicted meanwhile by another replica
+        total += size
+    for _, size, path in sorted(entries):
+        if total <= COLUMNAR_CACHE_MAX_BYTES:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
 
-def create_risk_factors_analysis(df):
-    """Analyze risk factors correlation"""
-    st.markdown('<div class="section-header">⚠️ Risk Factors Analysis</div>', unsafe_allow_html=True)
-    
-    # Add display columns for proper color mapping
-    df_display = add_display_columns(df)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Risk factors by categories with gradient colors
-        risk_data = []
-        
-        # Calculate risk by cholesterol category
-        if 'chol_category' in df.columns:
-            chol_risk = df.groupby('chol_category')['has_heart_disease'].mean() * 100
-            for cat, risk in chol_risk.items():
-                risk_data.append({'Category': f'Cholesterol: {cat}', 'Risk': risk})
-        
-        # Calculate risk by BP category
-        if 'bp_category' in df.columns:
-            bp_risk = df.groupby('bp_category')['has_heart_disease'].mean() * 100
-            for cat, risk in bp_risk.items():
-                risk_data.append({'Category': f'BP: {cat}', 'Risk': risk})
-        
-        # Calculate risk by other factors (using original column for computation)
-        fbs_risk = df.groupby('fbs')['has_heart_disease'].mean() * 100
-        for fbs_val, risk in fbs_risk.items():
-            risk_data.append({'Category': f'Fasting Blood Sugar: {fbs_val}', 'Risk': risk})
-        
-        risk_df = pd.DataFrame(risk_data)
-        risk_df['Risk_Text'] = risk_df['Risk'].round(1)
-        
-        # Use a medical-themed color scale
-        fig = px.bar(risk_df, x='Risk', y='Category', orientation='h',
-                    title='Heart Disease Risk by Categories (%)',
-                    color='Risk', 
-                    color_continuous_scale=[[0, MEDICAL_COLORS['success']], 
-                                          [0.5, MEDICAL_COLORS['warning']], 
-                                          [1, MEDICAL_COLORS['primary']]],
-                    text='Risk_Text')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_layout(height=500, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
-        
-    with col2:
-        # Exercise-induced angina with teal colors
-        exang_disease = df_display.groupby(['exang_label', 'heart_disease_label']).size().reset_index(name='count')
-        
-        # Calculate percentages for exercise-induced angina
-        exang_totals = df_display.groupby('exang_label').size().reset_index(name='total')
-        exang_disease = exang_disease.merge(exang_totals, on='exang_label')
-        exang_disease['percentage'] = (exang_disease['count'] / exang_disease['total'] * 100).round(1)
-        
-        # Define colors for exercise-induced angina
-        exang_colors = {'No': MEDICAL_COLORS['light_green'], 'Yes': MEDICAL_COLORS['navy']}
-        
-        fig = px.bar(exang_disease, x='exang_label', y='count', color='heart_disease_label',
-                    title='Heart Disease Distribution by Exercise-Induced Angina',
-                    labels={'exang_label': 'Exercise-Induced Angina', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
-                    color_discrete_map=HEART_DISEASE_COLORS,
-                    text='percentage')
-        
-        # Add percentage labels inside bars
-        fig.update_traces(texttemplate='%{text}%', textposition='inside')
-        fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
+def _json_value(value):
+    """Plain Python value for JSON (numpy scalars such as bool_ are not serializable)"""
+    return value.item() if isinstance(value, np.generic) else value
 
-def create_insights_and_recommendations(df):
-    """Generate insights and recommendations"""
-    st.markdown('<div class="section-header">💡 Key Insights & Recommendations</div>', unsafe_allow_html=True)
-    
-    # Calculate key statistics
-    heart_disease_rate = (df['has_heart_disease'].sum() / len(df)) * 100
-    
-    # Calculate gender-specific rates
-    male_df = df[df['sex'] == 'Male']
-    female_df = df[df['sex'] == 'Female']
-    
-    male_disease_rate = (male_df['has_heart_disease'].sum() / len(male_df)) * 100 if len(male_df) > 0 else 0
-    female_disease_rate = (female_df['has_heart_disease'].sum() / len(female_df)) * 100 if len(female_df) > 0 else 0
-    
-    # Age analysis
-    avg_age_disease = df[df['has_heart_disease'] == 1]['age'].mean()
-    avg_age_no_disease = df[df['has_heart_disease'] == 0]['age'].mean()
-    
-    # Chest pain analysis
-    cp_risk = df.groupby('cp')['has_heart_disease'].mean() * 100
-    highest_risk_cp = cp_risk.idxmax()
-    highest_risk_cp_rate = cp_risk.max()
-    
+def _publish_artifact(tmp_path, path, schema, statistics=None):
+    """Write the schema (and imputation statistics) then atomically rename the artifact into place"""
+    with open(os.path.join(tmp_path, 'schema.json'), 'w', encoding='utf-8') as f:
+        json.dump({'columns': schema}, f)
+    if statistics is not None:
+        with open(os.path.join(tmp_path, 'statistics.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'fill_values': {col: _json_value(value) for col, value in statistics['fill_values'].items()},
+                'sketches': {col: sketch.to_dict() for col, sketch in statistics['sketches'].items()},
+                'counters': {col: counter.to_dict() for col, counter in statistics['counters'].items()},
+            }, f)
 
-    st.markdown('<div class="insight-box">', unsafe_allow_html=True)
-    st.markdown("**🔍 Key Findings:**")
-    st.markdown(f"""
-    - **Overall Risk**: {heart_disease_rate:.1f}% of patients have heart disease
-    - **Gender Disparity**: Males have {male_disease_rate:.1f}% risk vs females {female_disease_rate:.1f}%
-    - **Age Factor**: Patients with heart disease are on average {avg_age_disease - avg_age_no_disease:.1f} years older
-    - **Highest Risk**: {highest_risk_cp} chest pain type has {highest_risk_cp_rate:.1f}% risk
-    - **Exercise Response**: Exercise-induced angina is a significant risk factor
-    """)
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Publish atomically; another replica may have written the same artifact first
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        for name in os.listdir(tmp_path):
+            os.remove(os.path.join(tmp_path, name))
+        os.rmdir(tmp_path)
+    prune_artifact_cache(path)
 
-def logout():
-    """Clear session state to logout"""
-    st.session_state["password_correct"] = False
-    st.rerun()
+def read_fill_statistics(path):
+    """Imputation statistics stored with an artifact, or None for artifacts without them"""
+    statistics_path = os.path.join(path, 'statistics.json')
+    if not os.path.exists(statistics_path):
+        return None
+    with open(statistics_path, encoding='utf-8') as f:
+        stored = json.load(f)
+    return {
+        'fill_values': stored['fill_values'],
+        'sketches': {col: QuantileSketch.from_dict(data) for col, data in stored['sketches'].items()},
+        'counters': {col: FrequencyCounter.from_dict(data) for col, data in stored['counters'].items()},
+    }
 
-def main():
-    # Check if user is authenticated
-    if not check_password():
+def write_columnar_artifact(df, path, statistics=None):
+    """Write a cleaned frame as one .npy file per column plus a JSON schema"""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    schema = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        entry = {'name': column, 'file': f'{i}.npy', 'dtype': str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype.kind not in 'biuf':
+            # Categoricals and strings are stored as integer codes plus their categories
+            categorical = series.astype('category')
+            entry['categories'] = categorical.cat.categories.tolist()
+            entry['ordered'] = bool(categorical.cat.ordered)
+            values = categorical.cat.codes.to_numpy()
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp_path, entry['file']), values)
+        schema.append(entry)
+    _publish_artifact(tmp_path, path, schema, statistics)
+
+def read_columnar_artifact(path):
+    """Rebuild a cleaned frame from its columnar artifact, memory-mapping each column"""
+    with open(os.path.join(path, 'schema.json'), encoding='utf-8') as f:
+        schema = json.load(f)['columns']
+    touch_cache_entry(path)
+    columns = {}
+    for entry in schema:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            # An all-missing column has no categories to infer their (string) dtype from
+            categories = pd.Index(entry['categories'], dtype=None if entry['categories'] else str)
+            series = pd.Series(pd.Categorical.from_codes(values, categories=categories,
+                                                         ordered=entry['ordered']))
+            if entry['dtype'] != 'category':
+                series = series.astype(entry['dtype'])
+            columns[entry['name']] = series
+        else:
+            columns[entry['name']] = pd.Series(values, copy=False)
+    return pd.DataFrame(columns, copy=False)
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch that keeps O(k log n) values
+
+    Values sit in levels where each item at level h stands for 2**h observations; a level
+    over its capacity is sorted and every other item is promoted. Until the first
+    compaction the sketch holds every value and quantiles are exact.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(self.k * (2 / 3) ** depth))
+
+    def update(self, values):
+        """Add a batch of values (NaN is ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch (e.g. from a different chunk or shard) into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the promoted half keeps the exact total weight
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[self._rng.integers(2)::2]])
+            level += 1
+
+    def quantile(self, q):
+        """Approximate q-quantile (exact, with interpolation, before any compaction)"""
+        if self.count == 0:
+            return np.nan
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        return float(values[order][np.searchsorted(cumulative, q * cumulative[-1])])
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data['k'])
+        sketch.count = data['count']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data['levels']]
+        return sketch
+
+class FrequencyCounter:
+    """Mergeable value counts for mode imputation"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, series):
+        """Count the non-missing values of a batch"""
+        for value, count in series.value_counts(dropna=True).items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def to_dict(self):
+        return {'counts': [[_json_value(value), count] for value, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        counter = cls()
+        counter.counts = {value: count for value, count in data['counts']}
+        return counter
+
+    def mode(self, default=0):
+        """Most frequent value; ties go to the smallest, like Series.mode()[0]"""
+        if not self.counts:
+            return default
+        top = max(self.counts.values())
+        return sorted(value for value, count in self.counts.items() if count == top)[0]
+
+def scan_fill_statistics(csv_path, chunksize=STREAM_CHUNK_ROWS):
+    """First streaming pass: per-chunk sketches merged into imputation values, row count and ranges"""
+    sketches = {col: QuantileSketch() for col in NUMERICAL_IMPUTE_COLUMNS}
+    counters = {col: FrequencyCounter() for col in CATEGORICAL_IMPUTE_COLUMNS}
+    value_ranges = {}
+    raw_dtypes = {}
+    n_rows = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        # read_csv infers dtypes per chunk (e.g. int without NaN, bool without NaN); widen them
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, np.dtype):
+                raw_dtypes[col] = np.result_type(raw_dtypes.get(col, chunk[col].dtype), chunk[col].dtype)
+        chunk = prepare_raw_data(chunk)
+        n_rows += len(chunk)
+        for col, sketch in sketches.items():
+            if col in chunk.columns:
+                sketch.update(chunk[col].to_numpy(dtype=np.float64))
+        for col, counter in counters.items():
+            if col in chunk.columns:
+                counter.update(chunk[col])
+        for col in chunk.select_dtypes('number').columns:
+            lo, hi = chunk[col].min(), chunk[col].max()
+            if col in value_ranges:
+                lo, hi = min(lo, value_ranges[col][0]), max(hi, value_ranges[col][1])
+            value_ranges[col] = (lo, hi)
+
+    fill_values = {col: sketch.median() for col, sketch in sketches.items() if sketch.count}
+    fill_values.update({col: counter.mode() for col, counter in counters.items() if counter.counts})
+    return {'fill_values': fill_values, 'n_rows': n_rows, 'value_ranges': value_ranges,
+            'raw_dtypes': raw_dtypes, 'sketches': sketches, 'counters': counters}
+
+def _smallest_integer_dtype(lo, hi):
+    """Smallest signed integer dtype holding [lo, hi]"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= lo and hi <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+class ColumnarArtifactWriter:
+    """Fill a columnar artifact of known row count from successive cleaned chunks
+
+    Numeric columns are written straight into preallocated .npy memory maps. Categorical
+    and string columns are stored as integer codes against a category list that grows
+    as chunks arrive; unordered categories are sorted on close (as astype('category') does).
+    """
+
+    def __init__(self, path, first_chunk, n_rows, value_ranges):
+        self.path = path
+        self.tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        self.offset = 0
+        os.makedirs(self.tmp_path, exist_ok=True)
+        self.columns = []
+        for i, column in enumerate(first_chunk.columns):
+            series = first_chunk[column]
+            entry = {'name': column, 'file': f'{i}.npy', 'dtype': str(series.dtype)}
+            if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype.kind not in 'biuf':
+                fixed = isinstance(series.dtype, pd.CategoricalDtype) and series.cat.ordered
+                entry['categories'] = series.cat.categories.tolist() if fixed else []
+                entry['ordered'] = bool(fixed)
+                storage = np.dtype(np.int32)
+            elif series.dtype.kind in 'iu' and COMPACT_DTYPES and column in value_ranges:
+                storage = _smallest_integer_dtype(*value_ranges[column])
+                entry['dtype'] = str(storage)
+            else:
+                storage = series.dtype
+            values = np.lib.format.open_memmap(os.path.join(self.tmp_path, entry['file']), mode='w+',
+                                               dtype=storage, shape=(n_rows,))
+            self.columns.append((entry, values, {value: code for code, value in enumerate(entry.get('categories', []))}))
+
+    def append(self, chunk):
+        """Write the next cleaned chunk"""
+        end = self.offset + len(chunk)
+        for entry, values, category_codes in self.columns:
+            series = chunk[entry['name']]
+            if 'categories' in entry:
+                codes, uniques = pd.factorize(series)
+                lookup = np.empty(len(uniques), dtype=np.int32)
+                for i, value in enumerate(uniques):
+                    if value not in category_codes:
+                        category_codes[value] = len(entry['categories'])
+                        entry['categories'].append(value)
+                    lookup[i] = category_codes[value]
+                values[self.offset:end] = np.where(codes < 0, -1, lookup[codes] if len(lookup) else -1)
+            else:
+                values[self.offset:end] = series.to_numpy()
+        self.offset = end
+
+    def close(self, statistics=None):
+        """Sort unordered categories, write the schema and publish the artifact"""
+        schema = []
+        for entry, values, _ in self.columns:
+            if 'categories' in entry:
+                if not entry['ordered'] and entry['categories']:
+                    order = sorted(range(len(entry['categories'])), key=lambda code: entry['categories'][code])
+                    remap = np.empty(len(order) + 1, dtype=np.int32)
+                    remap[np.array(order)] = np.arange(len(order), dtype=np.int32)
+                    remap[-1] = -1  # code -1 (missing) indexes the last slot
+                    for start in range(0, len(values), STREAM_CHUNK_ROWS):
+                        values[start:start + STREAM_CHUNK_ROWS] = remap[values[start:start + STREAM_CHUNK_ROWS]]
+                    entry['categories'] = [entry['categories'][code] for code in order]
+                entry['categories'] = [_json_value(value) for value in entry['categories']]
+            values.flush()
+            schema.append(entry)
+        _publish_artifact(self.tmp_path, self.path, schema, statistics)
+
+def load_data_streaming(csv_path=DATA_PATH, chunksize=STREAM_CHUNK_ROWS):
+    """Clean a CSV chunk by chunk in bounded memory into a memory-mapped columnar artifact
+
+    A first pass merges per-chunk quantile sketches and frequency counters into the
+    imputation values; a second pass cleans each chunk with them and streams it to disk.
+    """
+    artifact_path = columnar_artifact_path(csv_path)
+    if not os.path.isdir(artifact_path):
+        stats = scan_fill_statistics(csv_path, chunksize)
+        writer = None
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            df_cleaned = clean_data(chunk.astype(stats['raw_dtypes']), stats['fill_values'])
+            if writer is None:
+                writer = ColumnarArtifactWriter(artifact_path, df_cleaned, stats['n_rows'], stats['value_ranges'])
+            writer.append(df_cleaned)
+        if writer is None:
+            df_raw = prepare_raw_data(pd.read_csv(csv_path))
+            write_columnar_artifact(clean_data(df_raw), artifact_path, compute_fill_statistics(df_raw))
+        else:
+            writer.close(stats)
+    return read_columnar_artifact(artifact_path)
+
+def concat_cleaned_frames(frames):
+    """Concatenate cleaned frames, widening categoricals to the union of their categories"""
+    aligned = [{} for _ in frames]
+    for column in frames[0].columns:
+        dtypes = [frame[column].dtype for frame in frames]
+        if not any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        series = [frame[column].astype('category') for frame in frames]
+        categories = series[0].cat.categories
+        for other in series[1:]:
+            extra = other.cat.categories.difference(categories)
+            if len(extra):
+                categories = categories.append(extra)
+        ordered = series[0].cat.ordered
+        if not ordered:
+            categories = categories.sort_values()
+        for i, values in enumerate(series):
+            if not values.cat.categories.equals(categories) or values.cat.ordered != ordered:
+                aligned[i][column] = values.cat.set_categories(categories, ordered=ordered)
+            elif not isinstance(dtypes[i], pd.CategoricalDtype):
+                aligned[i][column] = values
+    return pd.concat([frame.assign(**columns) for frame, columns in zip(frames, aligned)], ignore_index=True)
+
+def compact_chunks(chunks, merge, size=len):
+    """Merge the last two chunks while the one before the last is at most twice as large
+
+    Chunk sizes then fall off geometrically, so there are O(log n) of them, and over all
+    appends every row is merged O(log n) times instead of the whole history on each one.
+    """
+    chunks = list(chunks)
+    while len(chunks) > 1 and size(chunks[-2]) <= 2 * size(chunks[-1]):
+        chunks[-2:] = [merge(chunks[-2:])]
+    return chunks
+
+def state_frame(state, columns=None):
+    """Every row of an in-memory state (or just `columns`) as one frame, its chunks concatenated"""
+    frames = state['frames'] if columns is None else [frame[columns] for frame in state['frames']]
+    return frames[0] if len(frames) == 1 else concat_cleaned_frames(frames)
+
+def take_rows(state, rows, columns=None):
+    """Rows (ascending positions) of an in-memory state as one frame, gathered chunk by chunk"""
+    frames = state['frames'] if columns is None else [frame[columns] for frame in state['frames']]
+    if len(frames) == 1:
+        return frames[0].take(rows)
+    starts = np.cumsum([0] + [len(frame) for frame in frames])
+    bounds = np.searchsorted(rows, starts)
+    return concat_cleaned_frames([frame.take(rows[lo:hi] - start) for frame, start, lo, hi
+                                  in zip(frames, starts, bounds[:-1], bounds[1:])])
+
+def column_ranges(df, ranges=None):
+    """[min, max] of every distribution column (NaN skipped), widened from `ranges` if given"""
+    found = {column: [float(np.nanmin(df[column])), float(np.nanmax(df[column]))] for column in DISTRIBUTION_COLUMNS}
+    if ranges is None:
+        return found
+    return {column: [min(ranges[column][0], lo), max(ranges[column][1], hi)] for column, (lo, hi) in found.items()}
+
+def list_shards(directory):
+    """Per-cohort CSV shards of a shard directory, in name order"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.csv'))
+
+def _source_signature(path):
+    """Cheap change marker of a CSV or shard directory: sizes and modification times"""
+    paths = list_shards(path) if os.path.isdir(path) else [path]
+    return tuple((p, os.stat(p).st_size, os.stat(p).st_mtime_ns) for p in paths)
+
+def _source_digest(path):
+    """Content digest of a CSV or of every shard in a directory (see _file_digest)"""
+    if not os.path.isdir(path):
+        return _file_digest(path)
+    digest = hashlib.sha256()
+    for shard in list_shards(path):
+        digest.update(f"{os.path.basename(shard)}:{_file_digest(shard)}\n".encode())
+    return digest.hexdigest()
+
+def _content_unchanged(path, state, signature):
+    """Whether a source whose signature moved still holds the loaded content
+
+    Only a source with the same files and sizes (e.g. touched, or rewritten in place) is
+    hashed; `state['digest']` is None when the loaded content was never hashed.
+    """
+    same_sizes = [entry[:2] for entry in signature] == [entry[:2] for entry in state['signature']]
+    return same_sizes and state.get('digest') is not None and _source_digest(path) == state['digest']
+
+def _shard_statistics(shard):
+    """Worker: cohorts, row count and mergeable imputation statistics of one shard
+
+    Cached next to the columnar artifacts (keyed by path, size and mtime) so later loads
+    learn the global imputation values without parsing shards they do not need.
+    """
+    _, size, mtime = _source_signature(shard)[0]
+    cache_path = None
+    if COLUMNAR_CACHE_DIR:
+        key = hashlib.sha256(os.path.abspath(shard).encode()).hexdigest()[:16]
+        cache_path = os.path.join(COLUMNAR_CACHE_DIR, f"shard-{key}-{size}-{mtime}-v{CLEANING_VERSION}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                result = json.load(f)
+            touch_cache_entry(cache_path)
+            return result
+
+    df_raw = prepare_raw_data(pd.read_csv(shard))
+    statistics = compute_fill_statistics(df_raw)
+    result = {
+        'n_rows': len(df_raw),
+        'datasets': sorted(df_raw['dataset'].dropna().unique().tolist()),
+        'sketches': {col: sketch.to_dict() for col, sketch in statistics['sketches'].items()},
+        'counters': {col: counter.to_dict() for col, counter in statistics['counters'].items()},
+    }
+    if cache_path:
+        os.makedirs(COLUMNAR_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f, default=_json_value)
+        os.replace(tmp_path, cache_path)
+        prune_artifact_cache(cache_path)
+    return result
+
+def _clean_shard(shard, fill_values):
+    """Worker: clean one shard with the global imputation values
+
+    Returns the path of its memory-mappable columnar artifact, or the frame itself when
+    the on-disk cache is disabled.
+    """
+    if not COLUMNAR_CACHE_DIR:
+        return clean_data(prepare_raw_data(pd.read_csv(shard)), fill_values)
+    fill_key = hashlib.sha256(json.dumps(fill_values, sort_keys=True, default=_json_value).encode()).hexdigest()[:12]
+    artifact_path = f"{columnar_artifact_path(shard)}-fill{fill_key}"
+    if not os.path.isdir(artifact_path):
+        write_columnar_artifact(clean_data(prepare_raw_data(pd.read_csv(shard)), fill_values), artifact_path)
+    return artifact_path
+
+def _parallel_map(func, items):
+    """Map over worker processes or threads when there is more than one item and more than one core
+
+    A single-threaded process (the command-line tools) forks its workers, which then see
+    the functions of this script. Inside the dashboard server, other threads (Tornado,
+    the warm-up and exact workers, the source watcher) may hold locks that a forked child
+    would inherit held, so the work runs on threads of this process instead; so it does
+    where fork is not available.
+    """
+    workers = min(SHARD_WORKERS, len(items))
+    if workers <= 1:
+        return [func(*args) for args in items]
+    if threading.active_count() > 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        with ThreadPoolExecutor(workers, thread_name_prefix='shards') as executor:
+            return list(executor.map(func, *zip(*items)))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+        return list(executor.map(func, *zip(*items)))
+
+def load_shards(directory, datasets=None):
+    """Clean a directory of per-cohort shards in parallel; returns (frame, statistics)
+
+    Imputation uses medians and modes merged across every shard, so the result matches
+    cleaning the concatenated CSV. With `datasets`, only shards holding those cohorts are
+    parsed and cleaned; the rest contribute their cached statistics.
+    """
+    shards = list_shards(directory)
+    if not shards:
+        raise FileNotFoundError(f"No CSV shards in {directory}")
+    shard_statistics = _parallel_map(_shard_statistics, [(shard,) for shard in shards])
+
+    sketches = {col: QuantileSketch() for col in NUMERICAL_IMPUTE_COLUMNS}
+    counters = {col: FrequencyCounter() for col in CATEGORICAL_IMPUTE_COLUMNS}
+    for stats in shard_statistics:
+        for col, data in stats['sketches'].items():
+            sketches[col].merge(QuantileSketch.from_dict(data))
+        for col, data in stats['counters'].items():
+            counters[col].merge(FrequencyCounter.from_dict(data))
+    fill_values = {col: sketch.median() for col, sketch in sketches.items() if sketch.count}
+    fill_values.update({col: counter.mode() for col, counter in counters.items() if counter.counts})
+
+    selected = [shard for shard, stats in zip(shards, shard_statistics)
+                if datasets is None or set(stats['datasets']) & set(datasets)]
+    if not selected:
+        raise ValueError(f"No shard in {directory} holds cohorts {datasets}")
+    results = _parallel_map(_clean_shard, [(shard, fill_values) for shard in selected])
+    frames = [read_columnar_artifact(result) if isinstance(result, str) else result for result in results]
+    df = concat_cleaned_frames(frames)
+    if datasets is not None:
+        df = df[df['dataset'].isin(datasets)].reset_index(drop=True)
+    return df, {'fill_values': fill_values, 'sketches': sketches, 'counters': counters}
+
+def _label_categorical(values, labels):
+    """Categorical of `labels[value]` with every label as a category (sorted, as artifacts store them)"""
+    return pd.Categorical(values.map(labels), categories=sorted(labels.values()))
+
+def display_labels(df):
+    """String versions of the outcome, exang and fbs columns for proper color mapping"""
+    # Through float so bool, object and integer encodings of the flags all match the keys
+    exang = df['exang'].astype(float)
+    if pd.api.types.is_numeric_dtype(df['fbs'].dtype):
+        fbs = _label_categorical(df['fbs'].astype(float), FBS_LABELS)
+    else:
+        fbs = pd.Categorical(df['fbs'], categories=sorted(FBS_LABELS.values()))
+    return {
+        'heart_disease_label': _label_categorical(df['has_heart_disease'], HEART_DISEASE_LABELS),
+        'exang_label': _label_categorical(exang, EXANG_LABELS),
+        'fbs_label': fbs,
+    }
+
+def add_display_columns(df):
+    """Frame with the display label columns
+
+    clean_data already adds them, so a cleaned frame comes back as is; otherwise they are
+    added to a shallow copy, which shares the existing columns instead of copying them.
+    """
+    if set(DISPLAY_LABEL_COLUMNS) <= set(df.columns):
+        return df
+    df_display = df.copy(deep=False)
+    for column, values in display_labels(df).items():
+        df_display[column] = values
+    return df_display
+
+def _dimension_codes(series, labels=None):
+    """Integer-code a cube dimension; missing values get the extra last code
+
+    With `labels` the codes follow that existing label list (values outside it count as missing).
+    """
+    if labels is not None:
+        codes = pd.Categorical(series, categories=labels).codes
+    elif series.name == 'has_heart_disease':
+        # Outcome codes are positional (0 = no disease, 1 = disease) even if one is absent
+        codes = pd.Categorical(series, categories=[0, 1]).codes
+        labels = [0, 1]
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        labels = list(series.cat.categories)
+    else:
+        codes, uniques = pd.factorize(series, sort=True)
+        labels = list(uniques)
+    codes = np.where(codes < 0, len(labels), codes)
+    return codes, labels
+
+def build_count_cube(df):
+    """Pre-aggregate patient counts per (age, cube dimension...) cell with prefix sums along age"""
+    ages = df['age'].to_numpy().astype(np.int64)
+    age_min, age_max = int(ages.min()), int(ages.max())
+
+    # Leading axis is every integer age in the data range, the rest are coded dimensions
+    codes = [ages - age_min]
+    shape = [age_max - age_min + 1]
+    labels = {}
+    for dim in CUBE_DIMENSIONS:
+        dim_codes, dim_labels = _dimension_codes(df[dim])
+        codes.append(dim_codes)
+        shape.append(len(dim_labels) + 1)
+        labels[dim] = dim_labels
+
+    # One bincount over the flattened cell index fills the whole cube
+    cells = np.ravel_multi_index(codes, shape)
+    counts = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+    cube = {'age_min': age_min, 'age_max': age_max, 'labels': labels}
+    cube.update(_cube_prefix_sums(counts, age_min, age_max))
+    return cube
+
+def _cube_prefix_sums(counts, age_min, age_max):
+    """Prefix sums along age of per-cell counts and of age-weighted counts"""
+    # prefix[i] holds the counts of every age below age_min + i
+    prefix = np.zeros([counts.shape[0] + 1] + list(counts.shape[1:]), dtype=np.int64)
+    np.cumsum(counts, axis=0, out=prefix[1:])
+
+    # Age-weighted prefix sums per (sex, dataset, outcome) for the average age metrics
+    age_weights = np.arange(age_min, age_max + 1).reshape([-1] + [1] * (counts.ndim - 1))
+    age_sums = (counts * age_weights).sum(axis=tuple(range(3, counts.ndim - 1)))
+    age_prefix = np.zeros([counts.shape[0] + 1] + list(age_sums.shape[1:]), dtype=np.int64)
+    np.cumsum(age_sums, axis=0, out=age_prefix[1:])
+
+    return {'prefix': prefix, 'age_prefix': age_prefix}
+
+def extend_count_cube(cube, new_rows):
+    """Count cube with `new_rows` added, or None when they fall outside its ages or labels"""
+    ages = new_rows['age'].to_numpy().astype(np.int64)
+    if len(ages) and (ages.min() < cube['age_min'] or ages.max() > cube['age_max']):
+        return None
+
+    codes = [ages - cube['age_min']]
+    shape = [cube['age_max'] - cube['age_min'] + 1]
+    for dim in CUBE_DIMENSIONS:
+        labels = cube['labels'][dim]
+        series = new_rows[dim]
+        if (series.notna() & ~series.isin(labels)).any():
+            return None
+        dim_codes, _ = _dimension_codes(series, labels)
+        codes.append(dim_codes)
+        shape.append(len(labels) + 1)
+
+    # Only the delta is counted; its prefix sums are added onto the existing ones
+    cells = np.ravel_multi_index(codes, shape)
+    delta = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+    delta_sums = _cube_prefix_sums(delta, cube['age_min'], cube['age_max'])
+    return dict(cube, prefix=cube['prefix'] + delta_sums['prefix'],
+                age_prefix=cube['age_prefix'] + delta_sums['age_prefix'])
+
+def _age_run(ages, start=0):
+    """Age-sorted positions (from `start` on) and sorted ages of one chunk of rows"""
+    order = np.argsort(ages, kind='stable')
+    return {'age_order': start + order, 'sorted_ages': ages[order]}
+
+def merge_age_runs(runs):
+    """One age-sorted run of consecutive runs, ordered as _age_run orders all their rows"""
+    sorted_ages = np.concatenate([run['sorted_ages'] for run in runs])
+    # Stable, and earlier runs hold earlier rows: equal ages stay in row order
+    order = np.argsort(sorted_ages, kind='stable')
+    return {'age_order': np.concatenate([run['age_order'] for run in runs])[order],
+            'sorted_ages': sorted_ages[order]}
+
+def _write_bits(bitmap, start, bits):
+    """Write `bits` into a packed bitmap from bit `start` on, keeping the bits before it"""
+    first, shift = divmod(start, 8)
+    packed = np.packbits(np.concatenate([np.zeros(shift, dtype=bool), bits]))
+    if shift:
+        packed[0] |= bitmap[first] & ((0xFF << (8 - shift)) & 0xFF)
+    bitmap[first:first + len(packed)] = packed
+
+def build_filter_index(df):
+    """Build reusable row indexes: packed per-value bitmaps and age-sorted runs of row positions"""
+    bitmaps = {}
+    for column in FILTER_INDEX_COLUMNS:
+        # Values keep their order of first appearance, like Series.unique()
+        codes, values = pd.factorize(df[column])
+        bitmaps[column] = {value: np.packbits(codes == i) for i, value in enumerate(values)}
+
+    return {
+        'n_rows': len(df),
+        'runs': [_age_run(df['age'].to_numpy())],
+        'bitmaps': bitmaps,
+    }
+
+def extend_filter_index(index, new_rows):
+    """Filter index with `new_rows` appended after the indexed rows
+
+    The new rows get an age-sorted run of their own (merged by compact_chunks), and their
+    bits are written into the bitmaps' spare capacity: indexed rows are neither re-sorted
+    nor unpacked. The bitmaps may be shared with the previous index, which never reads
+    past its own `n_rows`.
+    """
+    n_rows, end = index['n_rows'], index['n_rows'] + len(new_rows)
+    runs = compact_chunks(index['runs'] + [_age_run(new_rows['age'].to_numpy(), n_rows)], merge_age_runs,
+                          size=lambda run: len(run['age_order']))
+
+    # Every bitmap keeps the same length, so any of them AND together; grown by doubling
+    capacity = len(next(iter(index['bitmaps'][FILTER_INDEX_COLUMNS[0]].values())))
+    if capacity * 8 < end:
+        capacity = max(-(-end // 8), 2 * capacity)
+    bitmaps = {}
+    for column in FILTER_INDEX_COLUMNS:
+        codes, values = pd.factorize(new_rows[column])
+        positions = {value: i for i, value in enumerate(values)}
+        column_bitmaps = {}
+        for value in list(index['bitmaps'][column]) + [v for v in values if v not in index['bitmaps'][column]]:
+            bitmap = index['bitmaps'][column].get(value)
+            if bitmap is None or len(bitmap) < capacity:
+                grown = np.zeros(capacity, dtype=np.uint8)
+                if bitmap is not None:
+                    grown[:len(bitmap)] = bitmap
+                bitmap = grown
+            # Every bitmap's new bits are written, clearing any left by an abandoned refresh
+            _write_bits(bitmap, n_rows, codes == positions[value] if value in positions
+                        else np.zeros(len(new_rows), dtype=bool))
+            column_bitmaps[value] = bitmap
+        bitmaps[column] = column_bitmaps
+
+    return {
+        'n_rows': end,
+        'runs': runs,
+        'bitmaps': bitmaps,
+    }
+
+def filter_rows(index, age_range, selections):
+    """Sorted row positions within `age_range` matching every {column: value} selection"""
+    # Age range: two binary searches over each age-sorted run
+    lo_age, hi_age = np.int64(age_range[0]), np.int64(age_range[1])
+    rows = [run['age_order'][np.searchsorted(run['sorted_ages'], lo_age, side='left'):
+                             np.searchsorted(run['sorted_ages'], hi_age, side='right')]
+            for run in index['runs']]
+    rows = rows[0] if len(rows) == 1 else np.concatenate(rows)
+
+    # Categorical selections: AND the packed bitmaps, then test the candidates' bits
+    selected = []
+    for column, value in selections.items():
+        if value == 'All':
+            continue
+        bitmap = index['bitmaps'][column].get(value)
+        if bitmap is None:
+            return np.empty(0, dtype=np.int64)
+        selected.append(bitmap)
+    if selected:
+        mask = selected[0] if len(selected) == 1 else np.bitwise_and.reduce(selected)
+        # One byte per row for the combined mask keeps the gather free of int64 temporaries
+        rows = rows[np.unpackbits(mask, count=index['n_rows']).view(bool)[rows]]
+
+    return np.sort(rows)
+
+def build_association_codes(df):
+    """Integer codes of the association variables, built once per data version
+
+    Categoricals are coded by level and numerics by quantile bin (ASSOCIATION_BINS), so
+    every pair of variables has a contingency table; numerics also keep dense codes of
+    their sorted distinct values, from which the ranks of any row subset follow. Missing
+    values are -1, and variables with fewer than two observed levels are left out.
+    """
+    columns, levels, codes = [], [], []
+    for column in ASSOCIATION_CATEGORICAL:
+        column_codes, labels = _dimension_codes(df[column])
+        column_codes = np.where(column_codes < len(labels), column_codes, -1)
+        if np.unique(column_codes[column_codes >= 0]).size >= 2:
+            columns.append(column)
+            levels.append(len(labels))
+            codes.append(column_codes)
+
+    numeric, value_codes, distinct = [], [], []
+    for column in DISTRIBUTION_COLUMNS:
+        values = df[column].to_numpy(dtype=np.float64)
+        present = np.isfinite(values)
+        uniques, dense = np.unique(values[present], return_inverse=True)
+        if len(uniques) < 2:
+            continue
+        edges = np.unique(np.quantile(values[present], np.linspace(0, 1, ASSOCIATION_BINS + 1)))
+        bins = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+        ranked = np.full(len(values), -1)
+        ranked[present] = dense
+        numeric.append(column)
+        levels.append(len(edges) - 1)
+        codes.append(np.where(present, bins, -1))
+        value_codes.append(ranked)
+        distinct.append(len(uniques))
+
+    return {
+        'columns': columns + numeric,
+        'numeric': numeric,
+        'levels': levels,
+        'codes': np.column_stack(codes).astype(_smallest_integer_dtype(-1, max(levels))),
+        'value_codes': (np.column_stack(value_codes) if value_codes else np.empty((len(df), 0)))
+                       .astype(_smallest_integer_dtype(-1, max(distinct, default=0))),
+        'distinct': distinct,
+    }
+
+def build_facet_codes(df):
+    """One integer code per row for its combination of facet values, plus the facet labels
+
+    Each facet column is coded like a count cube dimension (missing values take the code
+    after the last label). Facets are folded in one at a time and the combination codes
+    are renumbered over the combinations that occur after each step, so the table of
+    combinations (one row of facet codes each) never outgrows the data, however many
+    facets there are; a filter state is then answered with one bincount over it.
+    """
+    labels = {}
+    codes = np.zeros(len(df), dtype=np.int64)
+    combinations = np.zeros((1, 0), dtype=np.int64)
+    for column in FACET_COLUMNS:
+        column_codes, labels[column] = _dimension_codes(df[column])
+        size = len(labels[column]) + 1
+        keys = codes * size + column_codes
+        space = len(combinations) * size
+        # Renumbered through a lookup table while the key space is small, by sorting past that
+        if space <= max(len(df), 1 << 16):
+            present = np.bincount(keys, minlength=space) > 0
+            uniques, codes = np.flatnonzero(present), (np.cumsum(present) - 1)[keys]
+        else:
+            uniques, codes = np.unique(keys, return_inverse=True)
+        combinations = np.column_stack([combinations[uniques // size], uniques % size])
+    return {
+        'labels': labels,
+        # Column-major, so each facet's codes over the combinations are contiguous
+        'combinations': np.asfortranarray(combinations.astype(np.intp)),
+        'codes': codes.astype(_smallest_integer_dtype(0, len(combinations))),
+    }
+
+def extend_facet_codes(facet_codes, new_rows, n_rows):
+    """Facet codes with `new_rows` appended after row `n_rows`, or None on a new label or combination
+
+    The new rows are coded against the existing labels and looked up in the existing
+    combination table, so only they are encoded (a full build_facet_codes renumbers every
+    combination, and is needed once the table itself changes). Their codes go into the
+    code array's spare capacity, like the filter index bitmaps (see extend_filter_index).
+    """
+    labels, combinations = facet_codes['labels'], facet_codes['combinations']
+    columns = []
+    for column in FACET_COLUMNS:
+        series = new_rows[column]
+        if (series.notna() & ~series.isin(labels[column])).any():
+            return None
+        columns.append(_dimension_codes(series, labels[column])[0])
+    found = pd.MultiIndex.from_arrays(combinations.T).get_indexer(pd.MultiIndex.from_arrays(columns))
+    if (found < 0).any():
+        return None
+    codes, end = facet_codes['codes'], n_rows + len(new_rows)
+    if len(codes) < end:
+        grown = np.zeros(max(end, 2 * len(codes)), dtype=codes.dtype)
+        grown[:n_rows] = codes[:n_rows]
+        codes = grown
+    codes[n_rows:end] = found
+    return dict(facet_codes, codes=codes)
+
+def facet_query(facet_codes, rows, facets):
+    """Rows (of `rows`) matching every facet selection, and each facet option's count
+
+    `facets` maps columns to their selected values (none selected: no restriction). An
+    option's count is the rows matching every *other* facet, so picking one option leaves
+    its siblings' counts in place. One bincount of the rows' combination codes counts
+    every observed combination; each facet's option counts then sum the combinations that
+    pass the other facets.
+    """
+    labels, combinations = facet_codes['labels'], facet_codes['combinations']
+    row_codes = facet_codes['codes'][rows]
+    counts = np.bincount(row_codes, minlength=len(combinations))
+
+    # Per restricted facet, which combinations pass it (missing values only pass an
+    # unrestricted facet), and per combination how many facets reject it
+    passes = {}
+    rejected = np.zeros(len(combinations), dtype=np.int32)
+    for axis, column in enumerate(FACET_COLUMNS):
+        if not facets.get(column):
+            continue
+        keep = np.zeros(len(labels[column]) + 1, dtype=bool)
+        for value in facets[column]:
+            if value in labels[column]:
+                keep[labels[column].index(value)] = True
+        passes[column] = keep[combinations[:, axis]]
+        rejected += ~passes[column]
+
+    option_counts = {}
+    weights = counts.astype(np.float64)
+    for axis, column in enumerate(FACET_COLUMNS):
+        if passes:
+            others = rejected == (0 if column not in passes else ~passes[column])
+            column_weights = np.where(others, weights, 0.0)
+        else:
+            column_weights = weights
+        totals = np.bincount(combinations[:, axis], weights=column_weights, minlength=len(labels[column]) + 1)
+        option_counts[column] = dict(zip(labels[column], totals[:len(labels[column])].astype(np.int64).tolist()))
+
+    if not passes:
+        return rows, option_counts
+    return rows[(rejected == 0)[row_codes]], option_counts
+
+def _csv_tail_digest(path, offset):
+    """Digest of the bytes just before `offset`, to recognize a file that was only appended to"""
+    start = max(0, offset - 64 * 1024)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+def _read_appended_rows(path, offset, size):
+    """Parse the complete CSV lines between `offset` and `size`; returns (frame or None, new offset)"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        appended = f.read(size - offset)
+    # A line still being written has no trailing newline yet; leave it for the next refresh
+    end = appended.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+    return pd.read_csv(io.BytesIO(header + appended[:end])), offset + end
+
+def _imputation_drift(fill_values, statistics):
+    """Columns whose current median/mode moved away from the value used for imputation"""
+    drift = {}
+    for col, sketch in statistics['sketches'].items():
+        used, current = fill_values.get(col), sketch.median()
+        if used is not None and abs(current - used) > IMPUTATION_DRIFT_TOLERANCE * max(abs(used), 1e-9):
+            drift[col] = (used, current)
+    for col, counter in statistics['counters'].items():
+        used, current = fill_values.get(col), counter.mode()
+        if used is not None and current != used:
+            drift[col] = (used, current)
+    return drift
+
+class DataStore:
+    """Cleaned dataset plus its count cube and filter index, kept current as rows are appended
+
+    The rows are held as `frames`: the loaded frame, then chunks of appended rows that
+    compact_chunks merges as they accumulate (read them with state_frame or take_rows).
+
+    Readers take `store.state`, a dict that is replaced as a whole, so a refresh never
+    exposes a frame, cube and index from different versions of the data. `prepare`, when
+    set, runs on each new state before it is swapped in (e.g. to warm the result cache).
+    """
+
+    _versions = iter(range(1, 1 << 62))
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.state = None
+        self.prepare = None
+        self.last_check = 0.0
+        self._lock = threading.RLock()
+        self.reload('initial load')
+
+    def _install(self, **state):
+        state['version'] = next(self._versions)
+        if self.prepare is not None:
+            self.prepare(state)
+        state['refreshed_at'] = time.time()
+        self.state = state
+
+    def reload(self, reason):
+        """Rebuild everything from the CSV or shard directory (or their columnar artifacts)"""
+        with self._lock:
+            signature = _source_signature(self.csv_path)
+            # Every cohort: the sidebar's dataset filter is chosen per session, over one
+            # shared store (only load_data(datasets=...) reads a subset of the shards)
+            df, statistics = load_cleaned_data(self.csv_path)
+            # Appends are tracked by offset within a single CSV; shard directories by signature
+            size = None if os.path.isdir(self.csv_path) else signature[0][1]
+            self._install(frames=[df], n_rows=len(df), statistics=statistics, fill_values=statistics['fill_values'],
+                          column_ranges=column_ranges(df), cube=build_count_cube(df), index=build_filter_index(df),
+                          facets=build_facet_codes(df), signature=signature, digest=_source_digest(self.csv_path),
+                          offset=size, tail_digest=_csv_tail_digest(self.csv_path, size) if size is not None else None,
+                          last_update=f"full reload ({reason})")
+
+    @profiled('data_refresh')
+    def refresh(self):
+        """Fold rows appended to the CSV since the last load into the frame, cube and index
+
+        Appended rows are cleaned with the existing imputation values. When folding them
+        into the median/mode sketches shows those values have drifted beyond
+        IMPUTATION_DRIFT_TOLERANCE, or the file was rewritten rather than appended to,
+        everything is rebuilt instead. Returns 'unchanged', 'appended' or 'reloaded'.
+        """
+        with self._lock:
+            self.last_check = time.time()
+            state = self.state
+            signature = _source_signature(self.csv_path)
+            if signature == state['signature']:
+                return 'unchanged'
+            if _content_unchanged(self.csv_path, state, signature):
+                # Touched but not changed: remember the new signature, keep the version
+                self.state = dict(state, signature=signature)
+                return 'unchanged'
+            if state['offset'] is None:
+                self.reload('shards changed')
+                return 'reloaded'
+            size = signature[0][1]
+            if size == state['offset']:
+                self.reload('source rewritten')
+                return 'reloaded'
+            if size < state['offset'] or _csv_tail_digest(self.csv_path, state['offset']) != state['tail_digest']:
+                self.reload('source rewritten')
+                return 'reloaded'
+
+            raw_rows, offset = _read_appended_rows(self.csv_path, state['offset'], size)
+            if raw_rows is None:
+                return 'unchanged'
+            raw_rows = prepare_raw_data(raw_rows)
+
+            # Track the medians and modes including the new rows
+            statistics = {
+                'fill_values': state['fill_values'],
+                'sketches': {col: QuantileSketch.from_dict(sketch.to_dict()) for col, sketch in state['statistics']['sketches'].items()},
+                'counters': {col: FrequencyCounter.from_dict(counter.to_dict()) for col, counter in state['statistics']['counters'].items()},
+            }
+            new_statistics = compute_fill_statistics(raw_rows)
+            for col, sketch in statistics['sketches'].items():
+                sketch.merge(new_statistics['sketches'][col])
+            for col, counter in statistics['counters'].items():
+                counter.merge(new_statistics['counters'][col])
+            drift = _imputation_drift(state['fill_values'], statistics)
+            if drift:
+                self.reload('imputation drift in ' + ', '.join(sorted(drift)))
+                return 'reloaded'
+
+            # Only the new rows are cleaned, counted, indexed and coded; the loaded rows
+            # stay as they are, the new ones a chunk of their own
+            new_rows = clean_data(raw_rows, state['fill_values'])
+            frames = compact_chunks(state['frames'] + [new_rows], concat_cleaned_frames)
+            cube = extend_count_cube(state['cube'], new_rows)
+            facets = extend_facet_codes(state['facets'], new_rows, state['n_rows'])
+            if cube is None or facets is None:
+                # A new age, label or facet combination: rebuilt over every row
+                frames = [concat_cleaned_frames(frames)]
+                cube = cube if cube is not None else build_count_cube(frames[0])
+                facets = facets if facets is not None else build_facet_codes(frames[0])
+            self._install(frames=frames, n_rows=state['n_rows'] + len(new_rows), statistics=statistics,
+                          fill_values=state['fill_values'],
+                          column_ranges=column_ranges(new_rows, state['column_ranges']), cube=cube,
+                          index=extend_filter_index(state['index'], new_rows), facets=facets,
+                          signature=_source_signature(self.csv_path), digest=None,
+                          offset=offset, tail_digest=_csv_tail_digest(self.csv_path, offset),
+                          last_update=f"appended {len(new_rows):,} rows")
+            return 'appended'
+
+
+def sqlite_database_path(csv_path):
+    """SQLite database file keyed by the CSV contents and the cleaning code version"""
+    key = f"{_source_digest(csv_path)[:32]}-v{CLEANING_VERSION}"
+    return os.path.join(COLUMNAR_CACHE_DIR or '.', f"{key}.sqlite")
+
+def write_sqlite_database(df, path, fill_values=None):
+    """Write the cleaned frame, its filter indexes and query metadata to a SQLite file
+
+    `fill_values` (the imputation values df was cleaned with) are kept in the metadata so a
+    model trained from the database cleans new rows the same way.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    labels = {dim: _dimension_codes(df[dim])[1] for dim in CUBE_DIMENSIONS}
+    meta = {'labels': labels, 'column_ranges': column_ranges(df), 'n_rows': len(df),
+            'facet_labels': build_facet_codes(df)['labels'],
+            'age_min': int(df['age'].min()), 'age_max': int(df['age'].max()),
+            'fill_values': fill_values}
+
+    # Categoricals of non-string values (exang) are stored as plain values so they keep an
+    # INTEGER column instead of the TEXT one pandas picks for categoricals
+    native = {col: df[col].astype(object) for col in df.columns
+              if isinstance(df[col].dtype, pd.CategoricalDtype)
+              and not pd.api.types.is_string_dtype(df[col].cat.categories)}
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        df.assign(**native).to_sql('patients', conn, index=False, chunksize=100_000)
+        for column in SQLITE_INDEX_COLUMNS:
+            conn.execute(f"CREATE INDEX idx_patients_{column} ON patients ({column})")
+        conn.execute("CREATE TABLE dashboard_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO dashboard_meta VALUES (?, ?)",
+                         [(key, json.dumps(value, default=_json_value)) for key, value in meta.items()])
+        conn.commit()
+    finally:
+        conn.close()
+    # Readers in other workers only ever see a complete database
+    os.replace(tmp_path, path)
+    if COLUMNAR_CACHE_DIR:
+        prune_artifact_cache(path)
+
+class SQLiteReadPool:
+    """Fixed pool of read-only connections to one SQLite file, shared across sessions"""
+
+    def __init__(self, path, size=SQLITE_POOL_SIZE):
+        self.path = path
+        self._idle = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = 1")
+            self._idle.put(conn)
+
+    def execute(self, sql, params=()):
+        """Run one query on an idle connection and return every row"""
+        conn = self._idle.get()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            self._idle.put(conn)
+
+def _sqlite_filter(age_range, selections, facets=None):
+    """WHERE clause and parameters for a sidebar filter state"""
+    clauses = ["age BETWEEN ? AND ?"]
+    params = [int(age_range[0]), int(age_range[1])]
+    for column, value in selections.items():
+        if value != 'All':
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    for column, values in (facets or {}).items():
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    return " AND ".join(clauses), params
+
+def query_sqlite_count(state, age_range, selections, facets=None):
+    """Number of rows matching a sidebar filter state"""
+    where, params = _sqlite_filter(age_range, selections, facets)
+    return state['pool'].execute(f"SELECT COUNT(*) FROM patients WHERE {where}", params)[0][0]
+
+def query_sqlite_facets(state, age_range, selections, facets):
+    """Each facet option's count (rows matching every other facet), one GROUP BY per facet"""
+    option_counts = {}
+    for column in FACET_COLUMNS:
+        others = {other: values for other, values in facets.items() if other != column}
+        where, params = _sqlite_filter(age_range, selections, others)
+        rows = state['pool'].execute(f"SELECT {column}, COUNT(*) FROM patients WHERE {where} GROUP BY 1", params)
+        found = dict(rows)
+        option_counts[column] = {label: found.get(label, 0) for label in state['facet_labels'][column]}
+    return option_counts
+
+def query_sqlite_aggregates(state, age_range, selected_gender='All', selected_dataset='All', facets=None):
+    """Answer every section's aggregates for a filter state with one SQL GROUP BY"""
+    labels = state['labels']
+    dims = ['age_group'] + CUBE_DIMENSIONS
+    positions = {dim: {label: i for i, label in enumerate(labels[dim])}
+                 for dim in CUBE_DIMENSIONS}
+    positions['age_group'] = {label: i for i, label in enumerate(AGE_GROUP_LABELS)}
+
+    where, params = _sqlite_filter(age_range, {'sex': selected_gender, 'dataset': selected_dataset}, facets)
+    columns = ", ".join(dims)
+    rows = state['pool'].execute(
+        f"SELECT {columns}, COUNT(*), SUM(age) FROM patients WHERE {where} GROUP BY {columns}", params)
+
+    # Scatter the (bounded number of) groups into the count layout the cube path produces
+    shape = [len(AGE_GROUP_LABELS) + 1] + [len(labels[dim]) + 1 for dim in CUBE_DIMENSIONS]
+    by_group = np.zeros(shape, dtype=np.int64)
+    age_sums = np.zeros(shape[-1], dtype=np.float64)
+    for row in rows:
+        cell = tuple(positions[dim].get(value, len(positions[dim])) for dim, value in zip(dims, row))
+        by_group[cell] += row[-2]
+        age_sums[cell[-1]] += row[-1]
+
+    return _aggregates_from_counts(by_group, labels, age_sums)
+
+def query_sqlite_distribution(state, column, edges, age_range, selections, facets=None):
+    """Histogram counts per outcome of one column, binned inside SQLite"""
+    bins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / bins
+    where, params = _sqlite_filter(age_range, selections, facets)
+    rows = state['pool'].execute(
+        f"SELECT has_heart_disease, MIN(MAX(CAST(({column} - ?) / ? AS INTEGER), 0), ?) AS bin, COUNT(*) "
+        f"FROM patients WHERE {where} AND {column} IS NOT NULL GROUP BY 1, 2",
+        [float(edges[0]), float(width), bins - 1] + params)
+    counts = np.zeros((2, bins), dtype=np.int64)
+    for outcome, bin_index, count in rows:
+        if outcome in (0, 1):
+            counts[outcome, bin_index] += count
+    return counts
+
+class SQLiteStore:
+    """Dashboard state backed by a shared SQLite file instead of an in-memory frame
+
+    Only the bounded metadata (labels, ranges, row count) is held per worker; a change
+    to the CSV produces a new database file, picked up by a full reload.
+    """
+
+    _versions = iter(range(1, 1 << 62))
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.state = None
+        self.prepare = None
+        self.last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload('initial load')
+
+    def reload(self, reason):
+        """Open (building it first if needed) the database for the current CSV"""
+        with self._lock:
+            signature = _source_signature(self.csv_path)
+            path = sqlite_database_path(self.csv_path)
+            if not os.path.exists(path):
+                df, statistics = load_cleaned_data(self.csv_path)
+                write_sqlite_database(df, path, statistics['fill_values'])
+                del df
+            else:
+                touch_cache_entry(path)
+            pool = SQLiteReadPool(path)
+            meta = {key: json.loads(value) for key, value in pool.execute("SELECT key, value FROM dashboard_meta")}
+            state = dict(meta, version=next(self._versions), pool=pool, db_path=path,
+                         signature=signature, digest=_source_digest(self.csv_path),
+                         last_update=f"full reload ({reason})")
+            if self.prepare is not None:
+                self.prepare(state)
+            state['refreshed_at'] = time.time()
+            self.state = state
+
+    @profiled('data_refresh')
+    def refresh(self):
+        """Reload when the CSV changed; returns 'unchanged' or 'reloaded'"""
+        with self._lock:
+            self.last_check = time.time()
+            state = self.state
+            signature = _source_signature(self.csv_path)
+            if signature == state['signature']:
+                return 'unchanged'
+            if _content_unchanged(self.csv_path, state, signature):
+                self.state = dict(state, signature=signature)
+                return 'unchanged'
+        self.reload('source changed')
+        return 'reloaded'
+
+@st.cache_resource(show_spinner=False)
+def get_data_store():
+    """Process-wide data store (see DATA_BACKEND) shared by every session"""
+    if DATA_BACKEND == 'sqlite':
+        return SQLiteStore(DATA_PATH)
+    return DataStore(DATA_PATH)
+
+class SourceWatcher:
+    """Daemon thread refreshing a data store whenever its source changes
+
+    Every SOURCE_CHECK_SECONDS it runs `store.refresh()`, which compares sizes and
+    modification times (hashing the content only when those moved) and rebuilds off the
+    request path; sessions keep reading the previous state until the new one is swapped in.
+    """
+
+    def __init__(self, store, interval=SOURCE_CHECK_SECONDS):
+        self.store = store
+        self.interval = interval
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='source-watcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.store.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the current version; the next check tries again
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def stop(self):
+        """Stop checking (a refresh already running completes)"""
+        self._stop.set()
+
+@st.cache_resource(show_spinner=False)
+def start_source_watcher():
+    """Process-wide watcher of the data store's source
+
+    New versions warm the result cache for the default view before they are swapped in,
+    so the first rerun on fresh data is served from the cache.
+    """
+    store = get_data_store()
+    # The watcher thread has no script context; it gets the cache handed over
+    cache = get_result_cache()
+    store.prepare = lambda state: warm_view(warmup_views(state)[0], cache)
+    return SourceWatcher(store)
+
+def state_age_bounds(state):
+    """Smallest and largest age in one version of the data"""
+    if 'pool' in state:
+        return state['age_min'], state['age_max']
+    return state['cube']['age_min'], state['cube']['age_max']
+
+def state_options(state, column):
+    """Values offered by a sidebar filter"""
+    if 'pool' in state:
+        return list(state['labels'][column])
+    return list(state['index']['bitmaps'][column])
+
+def state_facet_labels(state):
+    """Options of every facet filter ({column: labels})"""
+    if 'pool' in state:
+        return state['facet_labels']
+    return state['facets']['labels']
+
+def stratified_sample_rows(strata, target_rows=SAMPLE_ROWS, seed=0):
+    """(row positions, step) of a stratified systematic sample of about `target_rows` rows
+
+    Rows are ordered by stratum and, within it, randomly; every step-th row is kept, so each
+    stratum contributes its proportional share and every row stands for `step` rows.
+    """
+    step = max(1, -(-len(strata) // target_rows))
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(strata)), strata))
+    return np.sort(order[rng.integers(step)::step]), step
+
+def _sample_state(sample, step, state):
+    """In-memory state of a sample frame; every count read from it stands for `step` rows
+
+    The histogram ranges are the full data's, so approximate and exact bins line up.
+    """
+    return {'version': ('sample', state['version']), 'frames': [sample], 'n_rows': len(sample),
+            'population_rows': state['n_rows'], 'scale': step, 'column_ranges': state['column_ranges'],
+            'cube': build_count_cube(sample), 'index': build_filter_index(sample),
+            'facets': build_facet_codes(sample)}
+
+@st.cache_resource
+def get_sample_state(version, _state):
+    """Stratified sample (by SAMPLE_STRATA) of one data version, built once and shared"""
+    if 'pool' not in _state:
+        strata = state_frame(_state, SAMPLE_STRATA)
+        codes, shape = [], []
+        for column in SAMPLE_STRATA:
+            column_codes, labels = _dimension_codes(strata[column])
+            codes.append(column_codes)
+            shape.append(len(labels) + 1)
+        rows, step = stratified_sample_rows(np.ravel_multi_index(codes, shape))
+        return _sample_state(take_rows(_state, rows).reset_index(drop=True), step, _state)
+
+    # SQLite: number the rows of each stratum in random order and keep every step-th
+    step = max(1, -(-_state['n_rows'] // SAMPLE_ROWS))
+    columns = list(dict.fromkeys(['age', 'age_group'] + CUBE_DIMENSIONS + FILTER_INDEX_COLUMNS
+                                 + list(FACET_COLUMNS) + list(DISTRIBUTION_COLUMNS)
+                                 + list(ASSOCIATION_CATEGORICAL) + MODEL_NUMERIC_FEATURES
+                                 + MODEL_CATEGORICAL_FEATURES))
+    strata = ", ".join(SAMPLE_STRATA)
+    rows = _state['pool'].execute(
+        f"SELECT {', '.join(columns)} FROM (SELECT *, ROW_NUMBER() OVER "
+        f"(PARTITION BY {strata} ORDER BY random()) AS position FROM patients) WHERE (position + ?) % ? = 0",
+        [int(np.random.default_rng(0).integers(step)), step])
+    sample = pd.DataFrame(rows, columns=columns)
+    # SQLite hands booleans back as 0/1
+    for column, labels in _state['facet_labels'].items():
+        if labels and all(isinstance(label, bool) for label in labels):
+            sample[column] = sample[column].astype(bool)
+    # Same category order as the full data, so approximate tables line up with exact ones
+    sample['age_group'] = pd.Categorical(sample['age_group'], categories=AGE_GROUP_LABELS)
+    for dim in CUBE_DIMENSIONS:
+        if dim != 'has_heart_disease':
+            sample[dim] = pd.Categorical(sample[dim], categories=_state['labels'][dim])
+    return _sample_state(sample, step, _state)
+
+def scale_counts(result, scale):
+    """Sample aggregates or facet counts scaled up to population counts (rates are unchanged)"""
+    scaled = {}
+    for key, value in result.items():
+        if key in ('total', 'heart_disease_count', 'male_count'):
+            value = value * scale
+        elif key == 'counts':
+            value = {column: {label: count * scale for label, count in counts.items()}
+                     for column, counts in value.items()}
+        elif isinstance(value, pd.DataFrame) and key != 'intervals':
+            value = value.assign(**{column: value[column] * scale for column in ('count', 'total', 'cases')
+                                    if column in value.columns})
+        scaled[key] = value
+    return scaled
+
+def count_filtered_rows(state, age_range, selections):
+    """Number of rows matching a sidebar filter state"""
+    if 'pool' in state:
+        return query_sqlite_count(state, age_range, selections)
+    return count_cube_rows(state['cube'], age_range, selections)
+
+def _age_prefix_index(cube, age):
+    """Position in the prefix arrays counting every age strictly below `age`"""
+    return int(np.clip(age - cube['age_min'], 0, cube['age_max'] - cube['age_min'] + 1))
+
+def _select_cube_value(cube, block, dim, value):
+    """Zero every slice of a (dimension...) block except the sidebar value of `dim`"""
+    if value == 'All':
+        return block
+    axis = CUBE_DIMENSIONS.index(dim)
+    keep = np.zeros(block.shape[axis], dtype=bool)
+    if value in cube['labels'][dim]:
+        keep[cube['labels'][dim].index(value)] = True
+    mask_shape = [1] * block.ndim
+    mask_shape[axis] = -1
+    return block * keep.reshape(mask_shape)
+
+def count_cube_rows(cube, age_range, selections):
+    """Rows matching a filter state, from two prefix slices of the count cube
+
+    Touches only cube cells, so the cost does not grow with the number of rows.
+    """
+    lo, hi = age_range
+    if lo > hi:
+        return 0
+    block = cube['prefix'][_age_prefix_index(cube, hi + 1)] - cube['prefix'][_age_prefix_index(cube, lo)]
+    for dim, value in selections.items():
+        block = _select_cube_value(cube, block, dim, value)
+    return int(block.sum())
+
+def _counts_table(counts, column, labels):
+    """Turn a (category, outcome) count matrix into the chart frame used by the sections"""
+    rows = []
+    totals = counts.sum(axis=1)
+    for i, label in enumerate(labels):
+        for outcome, outcome_label in enumerate(['No Heart Disease', 'Heart Disease']):
+            if counts[i, outcome] > 0:
+                rows.append({column: label, 'heart_disease_label': outcome_label,
+                             'count': int(counts[i, outcome]), 'total': int(totals[i])})
+    table = pd.DataFrame(rows, columns=[column, 'heart_disease_label', 'count', 'total'])
+    table['percentage'] = (table['count'] / table['total'] * 100).round(1)
+    return table
+
+def _risk_rows(counts, prefix_label, labels):
+    """Heart disease rate (%) per category for the risk factor chart, with the counts behind it"""
+    rows = []
+    totals = counts.sum(axis=1)
+    for i, label in enumerate(labels):
+        if totals[i] > 0:
+            rows.append({'Category': f'{prefix_label}: {label}', 'Risk': counts[i, 1] / totals[i] * 100,
+                         'Factor': prefix_label, 'cases': int(counts[i, 1]), 'total': int(totals[i])})
+    return rows
+
+def _aggregates_from_counts(by_group, labels, age_sums):
+    """Derive every section's tables and statistics from (age group, cube dimension...) counts
+
+    `by_group` has one slot per age group plus a trailing missing-group slot, followed by
+    one axis per CUBE_DIMENSIONS entry; `age_sums` holds the summed ages per outcome.
+    """
+    cells = by_group.sum(axis=0)
+
+    def by_dimension(dim):
+        """(category, outcome) matrix for one dimension, dropping the missing-value slot"""
+        axis = CUBE_DIMENSIONS.index(dim)
+        other = tuple(i for i in range(cells.ndim - 1) if i != axis)
+        counts = cells.sum(axis=other)[:len(labels[dim])]
+        return counts[:, :2]
+
+    def rate(counts):
+        """Heart disease rate (%) of a (category, outcome) row"""
+        return counts[1] / counts.sum() * 100 if counts.sum() > 0 else 0
+
+    group_counts = by_group.sum(axis=tuple(range(1, by_group.ndim - 1)))[:len(AGE_GROUP_LABELS), :2]
+    sex_counts = by_dimension('sex')
+    cp_counts = by_dimension('cp')
+    exang_labels = ['Yes' if value else 'No' for value in labels['exang']]
+
+    risk_rows = (_risk_rows(by_dimension('chol_category'), 'Cholesterol', labels['chol_category'])
+                 + _risk_rows(by_dimension('bp_category'), 'BP', labels['bp_category'])
+                 + _risk_rows(by_dimension('fbs'), 'Fasting Blood Sugar', labels['fbs']))
+
+    # Overview and insight statistics
+    outcome_totals = cells.sum(axis=tuple(range(cells.ndim - 1)))
+    total = int(outcome_totals.sum())
+    heart_disease_count = int(outcome_totals[1])
+    sex_rows = {label: sex_counts[i] for i, label in enumerate(labels['sex'])}
+    male_counts = sex_rows.get('Male', np.zeros(2, dtype=np.int64))
+    female_counts = sex_rows.get('Female', np.zeros(2, dtype=np.int64))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cp_totals = cp_counts.sum(axis=1)
+        cp_risk = np.where(cp_totals > 0, cp_counts[:, 1] / cp_totals * 100, np.nan)
+        avg_age_by_outcome = age_sums[:2] / outcome_totals[:2]
+    has_cp = bool((cp_totals > 0).any())
+
+    return {
+        'total': total,
+        'heart_disease_count': heart_disease_count,
+        'heart_disease_rate': heart_disease_count / total * 100 if total else 0,
+        'avg_age': age_sums.sum() / total if total else np.nan,
+        'male_count': int(male_counts.sum()),
+        'male_disease_rate': rate(male_counts),
+        'female_disease_rate': rate(female_counts),
+        'avg_age_disease': avg_age_by_outcome[1],
+        'avg_age_no_disease': avg_age_by_outcome[0],
+        'highest_risk_cp': labels['cp'][int(np.nanargmax(cp_risk))] if has_cp else 'N/A',
+        'highest_risk_cp_rate': np.nanmax(cp_risk) if has_cp else np.nan,
+        'age_group': _counts_table(group_counts, 'age_group', AGE_GROUP_LABELS),
+        'sex': _counts_table(sex_counts, 'sex', labels['sex']),
+        'cp': _counts_table(cp_counts, 'cp', labels['cp']),
+        'chol_category': _counts_table(by_dimension('chol_category'), 'chol_category', labels['chol_category']),
+        'exang_label': _counts_table(by_dimension('exang'), 'exang_label', exang_labels),
+        'risk': pd.DataFrame(risk_rows, columns=['Category', 'Risk', 'Factor', 'cases', 'total']),
+    }
+
+def query_count_cube(cube, age_range, selected_gender='All', selected_dataset='All'):
+    """Answer every section's aggregates for a filter state from the count cube"""
+    def age_block(prefix, lo, hi):
+        if lo > hi:
+            return np.zeros_like(prefix[0])
+        return prefix[_age_prefix_index(cube, hi + 1)] - prefix[_age_prefix_index(cube, lo)]
+
+    def filtered(block):
+        block = _select_cube_value(cube, block, 'sex', selected_gender)
+        return _select_cube_value(cube, block, 'dataset', selected_dataset)
+
+    # Counts per age group: intersect each group's (lower, upper] bounds with the slider range
+    group_blocks = []
+    for lower, upper in zip(AGE_GROUP_BINS[:-1], AGE_GROUP_BINS[1:]):
+        lo, hi = max(age_range[0], lower + 1), min(age_range[1], upper)
+        group_blocks.append(filtered(age_block(cube['prefix'], lo, hi)))
+    group_blocks.append(np.zeros_like(group_blocks[0]))
+    by_group = np.stack(group_blocks)
+
+    # Summed ages per outcome over the slider range
+    age_sums = filtered(age_block(cube['age_prefix'], *age_range)).sum(axis=(0, 1))
+
+    return _aggregates_from_counts(by_group, cube['labels'], age_sums)
+
+def compute_aggregates(df, rows=None):
+    """Compute every section's aggregates from a (filtered) frame in one vectorized pass
+
+    With `rows` (row positions, e.g. from filter_rows) only those rows are aggregated;
+    just the needed columns are gathered, never a filtered copy of the frame.
+    """
+    def column(name):
+        return df[name] if rows is None else df[name].take(rows)
+
+    codes = []
+    shape = []
+    labels = {}
+    for dim in ['age_group'] + CUBE_DIMENSIONS:
+        dim_codes, dim_labels = _dimension_codes(column(dim))
+        codes.append(dim_codes)
+        shape.append(len(dim_labels) + 1)
+        labels[dim] = dim_labels
+
+    # One bincount over the flattened (age group, dimension...) cell index
+    cells = np.ravel_multi_index(codes, shape)
+    by_group = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+    # Align the age group axis with AGE_GROUP_LABELS even when the frame lacks some groups
+    if labels['age_group'] != AGE_GROUP_LABELS:
+        aligned = np.zeros([len(AGE_GROUP_LABELS) + 1] + shape[1:], dtype=by_group.dtype)
+        for i, label in enumerate(labels['age_group']):
+            aligned[AGE_GROUP_LABELS.index(label)] += by_group[i]
+        aligned[-1] += by_group[-1]
+        by_group = aligned
+
+    outcome_codes = codes[-1]
+    age_sums = np.bincount(outcome_codes, weights=column('age').to_numpy(dtype=np.float64),
+                           minlength=shape[-1])
+
+    return _aggregates_from_counts(by_group, labels, age_sums)
+
+def bootstrap_rate_intervals(counts, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE_LEVEL, seed=0):
+    """Percentile bootstrap interval (%) of each row's disease rate in a (row, outcome) count matrix
+
+    Every resample redistributes the whole cohort over all cells with one multinomial
+    draw, so all resamples come from a single vectorized call. Returns (rows, 2) bounds.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    n = int(counts.sum())
+    if n == 0:
+        return np.full((len(counts), 2), np.nan)
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(n, counts.ravel() / n, size=resamples).reshape((resamples,) + counts.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = draws[..., 1] / draws.sum(axis=-1) * 100
+    tail = (1 - confidence) / 2 * 100
+    return np.nanpercentile(rates, [tail, 100 - tail], axis=0).T
+
+def _outcome_matrix(table, column):
+    """(labels, (label, outcome) count matrix) of a chart table from the aggregates"""
+    codes, labels = pd.factorize(table[column])
+    outcomes = (table['heart_disease_label'] == 'Heart Disease').to_numpy(dtype=np.int64)
+    matrix = np.zeros((len(labels), 2), dtype=np.int64)
+    np.add.at(matrix, (codes, outcomes), table['count'].to_numpy(dtype=np.int64))
+    return list(labels), matrix
+
+def confidence_intervals(aggregates):
+    """Bootstrap intervals for the risk chart and every percentage quoted in the insights"""
+    intervals = {}
+    total, cases = aggregates['total'], aggregates['heart_disease_count']
+    intervals['heart_disease_rate'] = tuple(bootstrap_rate_intervals([[total - cases, cases]])[0])
+
+    sex_labels, sex_counts = _outcome_matrix(aggregates['sex'], 'sex')
+    sex_bounds = dict(zip(sex_labels, map(tuple, bootstrap_rate_intervals(sex_counts))))
+    intervals['male_disease_rate'] = sex_bounds.get('Male', (np.nan, np.nan))
+    intervals['female_disease_rate'] = sex_bounds.get('Female', (np.nan, np.nan))
+
+    cp_labels, cp_counts = _outcome_matrix(aggregates['cp'], 'cp')
+    cp_bounds = dict(zip(cp_labels, map(tuple, bootstrap_rate_intervals(cp_counts))))
+    intervals['highest_risk_cp_rate'] = cp_bounds.get(aggregates['highest_risk_cp'], (np.nan, np.nan))
+
+    # Each risk factor partitions the cohort, so its categories are resampled together
+    risk = aggregates['risk']
+    bounds = np.full((len(risk), 2), np.nan)
+    for _, rows in risk.groupby('Factor', sort=False).indices.items():
+        factor = risk.iloc[rows]
+        counts = np.column_stack([factor['total'] - factor['cases'], factor['cases']])
+        bounds[rows] = bootstrap_rate_intervals(counts)
+    intervals['risk'] = pd.DataFrame({'Category': risk['Category'], 'low': bounds[:, 0], 'high': bounds[:, 1]})
+    return intervals
+
+def _subset_moments(df, codes, rows):
+    """(rows, 2 x numerics) matrix of centered values, then centered average ranks (ties
+    share their mean rank), of each numeric association variable within a row subset
+
+    Ranks come from counts of the dense value codes, so no sort runs per filter state.
+    Missing values are 0, i.e. they add nothing to any cross-product.
+    """
+    numeric = codes['numeric']
+    moments = np.zeros((len(rows), 2 * len(numeric)))
+    for j, column in enumerate(numeric):
+        value_codes = codes['value_codes'][rows, j]
+        present = value_codes >= 0
+        if not present.any():
+            continue
+        counts = np.bincount(value_codes[present], minlength=codes['distinct'][j])
+        average_rank = np.cumsum(counts) - (counts - 1) / 2
+        values = df[column].to_numpy(dtype=np.float64)
+        moments[:, j] = np.where(present, values - values[present].mean(), 0)
+        moments[:, len(numeric) + j] = np.where(present, average_rank[value_codes] - (present.sum() + 1) / 2, 0)
+    return moments
+
+def _table_statistics(table):
+    """(Cramér's V, mutual information in bits) of a contingency table"""
+    total = table.sum()
+    row_totals, column_totals = table.sum(axis=1), table.sum(axis=0)
+    observed = min((row_totals > 0).sum(), (column_totals > 0).sum())
+    if total == 0 or observed < 2:
+        return np.nan, np.nan
+    expected = np.outer(row_totals, column_totals)
+    cells = table > 0
+    ratio = table[cells] * total / expected[cells]
+    cramers_v = np.sqrt(max(0.0, (table[cells] * ratio).sum() / total - 1) / (observed - 1))
+    return cramers_v, float((table[cells] / total * np.log2(ratio)).sum())
+
+def association_matrix(df, codes, rows=None):
+    """Association of every pair of coded variables (build_association_codes) over a row subset
+
+    Categorical pairs get Cramér's V, numeric pairs Spearman's rho, and a numeric against a
+    categorical the correlation ratio (the point-biserial r, with its sign, when the
+    categorical is binary); every pair also gets its mutual information. All contingency
+    tables, per-level sums and rank cross-products come from a single product of the
+    one-hot coded rows with themselves, accumulated over ASSOCIATION_CHUNK_ROWS chunks.
+    `df` holds the numeric variables of just those rows, in the same order.
+    """
+    rows = np.arange(len(codes['codes'])) if rows is None else rows
+    columns, numeric, levels = codes['columns'], codes['numeric'], codes['levels']
+    n_rows, k, p = len(rows), len(columns), len(numeric)
+
+    # One-hot column of each (variable, level); missing values go to a trailing dump column
+    offsets = np.concatenate([[0], np.cumsum(levels)])
+    width = int(offsets[-1])
+    moments = _subset_moments(df, codes, rows)
+    counts = np.zeros((width + 1, width + 1))
+    sums = np.zeros((width + 1, 2 * p))
+    for start in range(0, n_rows, ASSOCIATION_CHUNK_ROWS):
+        chunk = codes['codes'][rows[start:start + ASSOCIATION_CHUNK_ROWS]].astype(np.int64)
+        cells = np.where(chunk >= 0, chunk + offsets[:-1], width)
+        onehot = np.zeros((len(chunk), width + 1), dtype=np.float32)
+        onehot.ravel()[(np.arange(len(chunk)) * (width + 1))[:, None] + cells] = 1
+        # float32 products (exact for the counts), accumulated across chunks in float64
+        counts += onehot.T @ onehot
+        sums += onehot.T @ moments[start:start + ASSOCIATION_CHUNK_ROWS].astype(np.float32)
+    squares = moments.T @ moments
+
+    strength = np.eye(k)
+    signed = np.eye(k)
+    measure = np.full((k, k), '', dtype=object)
+    information = np.zeros((k, k))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for a in range(k):
+            block_a = slice(offsets[a], offsets[a + 1])
+            # A variable's information with itself is its entropy
+            level_counts = np.diag(counts)[block_a]
+            shares = level_counts[level_counts > 0] / level_counts.sum()
+            information[a, a] = -(shares * np.log2(shares)).sum()
+            for b in range(a + 1, k):
+                block_b = slice(offsets[b], offsets[b + 1])
+                cramers_v, information[a, b] = _table_statistics(counts[block_a, block_b])
+                numeric_a = columns[a] in numeric
+                numeric_b = columns[b] in numeric
+                if numeric_a and numeric_b:
+                    i, j = p + numeric.index(columns[a]), p + numeric.index(columns[b])
+                    value = squares[i, j] / np.sqrt(squares[i, i] * squares[j, j])
+                    measure[a, b] = "Spearman's ρ"
+                    signed[a, b], strength[a, b] = value, abs(value)
+                elif numeric_a or numeric_b:
+                    numeric_column, block = (a, block_b) if numeric_a else (b, block_a)
+                    j = numeric.index(columns[numeric_column])
+                    level_counts, level_sums = np.diag(counts)[block], sums[block, j]
+                    observed = level_counts > 0
+                    eta = np.sqrt((level_sums[observed] ** 2 / level_counts[observed]).sum() / squares[j, j])
+                    if observed.sum() == 2:
+                        # Pearson r with the binary variable coded 0/1 by level order
+                        n0, n1 = level_counts[observed]
+                        measure[a, b] = 'Point-biserial r'
+                        signed[a, b] = level_sums[observed][1] / np.sqrt(squares[j, j] * n0 * n1 / (n0 + n1))
+                    else:
+                        measure[a, b] = 'Correlation ratio η'
+                        signed[a, b] = eta
+                    strength[a, b] = eta
+                else:
+                    measure[a, b] = "Cramér's V"
+                    signed[a, b] = strength[a, b] = cramers_v
+
+    lower = np.tril_indices(k, -1)
+    for matrix in (strength, signed, measure, information):
+        matrix[lower] = matrix.T[lower]
+    return {'columns': columns, 'n_rows': n_rows, 'strength': strength, 'signed': signed,
+            'measure': measure, 'mutual_information': information}
+
+def association_label(column):
+    """Display name of an association variable"""
+    return ASSOCIATION_CATEGORICAL.get(column) or DISTRIBUTION_COLUMNS[column]
+
+def association_strength(value):
+    """Word for an association's strength (ASSOCIATION_STRENGTHS)"""
+    return next(word for bound, word in ASSOCIATION_STRENGTHS if abs(value) < bound)
+
+def rank_outcome_associations(associations):
+    """Every variable's association with heart disease, strongest first"""
+    columns = associations['columns']
+    ranking = pd.DataFrame(columns=['column', 'Variable', 'Measure', 'Association', 'Strength',
+                                    'Mutual Information (bits)'])
+    if 'has_heart_disease' not in columns:
+        return ranking
+    outcome = columns.index('has_heart_disease')
+    others = [i for i in range(len(columns)) if i != outcome]
+    ranking = pd.DataFrame({
+        'column': [columns[i] for i in others],
+        'Variable': [association_label(columns[i]) for i in others],
+        'Measure': associations['measure'][outcome, others],
+        'Association': associations['signed'][outcome, others],
+        'Strength': associations['strength'][outcome, others],
+        'Mutual Information (bits)': associations['mutual_information'][outcome, others],
+    })
+    return ranking.sort_values('Strength', ascending=False, na_position='last', ignore_index=True)
+
+def _model_levels(series):
+    """Category values of a feature as strings, so bool, 0/1 and text encodings agree"""
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series.dropna().unique()
+    return sorted({str(value) for value in values})
+
+def _feature_codes(series, levels):
+    """Position of each value in `levels` (-1 for values the model never saw)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Map the (few) categories once, then gather by code
+        lookup = np.append(pd.Index(levels).get_indexer(series.cat.categories.astype(str)), -1)
+        return lookup[series.cat.codes.to_numpy()]
+    return pd.Index(levels).get_indexer(series.astype(str))
+
+def _design_matrix(frame, model):
+    """Intercept, standardized numerics and drop-first one-hot categoricals of a cleaned frame
+
+    Missing numerics sit at the training mean; unseen categories fall on the baseline level.
+    """
+    n = len(frame)
+    width = 1 + len(model['numeric']) + sum(len(levels) - 1 for levels in model['levels'].values())
+    X = np.zeros((n, width))
+    X[:, 0] = 1.0
+    for i, col in enumerate(model['numeric'], start=1):
+        values = frame[col].to_numpy(dtype=np.float64)
+        X[:, i] = np.nan_to_num((values - model['means'][col]) / model['scales'][col])
+    offset = 1 + len(model['numeric'])
+    rows = np.arange(n)
+    for col, levels in model['levels'].items():
+        codes = _feature_codes(frame[col], levels)
+        hit = codes > 0
+        X[rows[hit], offset + codes[hit] - 1] = 1.0
+        offset += len(levels) - 1
+    return X
+
+def train_risk_model(df, fill_values=None, l2=MODEL_L2):
+    """Fit an L2-penalized logistic regression of has_heart_disease by Newton's method (IRLS)
+
+    The model is a plain dict of lists and numbers so it can be written to JSON. Keeping the
+    imputation `fill_values` lets score_raw_patients clean new rows exactly like the training data.
+    """
+    numeric = list(MODEL_NUMERIC_FEATURES)
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in numeric}
+    model = {
+        'numeric': numeric,
+        'means': {col: float(np.nanmean(v)) for col, v in values.items()},
+        'scales': {col: float(np.nanstd(v)) or 1.0 for col, v in values.items()},
+        'ranges': {col: [float(np.nanmin(v)), float(np.nanmax(v))] for col, v in values.items()},
+        'levels': {col: _model_levels(df[col]) for col in MODEL_CATEGORICAL_FEATURES},
+        'fill_values': {col: _json_value(value) for col, value in (fill_values or {}).items()} or None,
+        'n_train': len(df),
+    }
+    X = _design_matrix(df, model)
+    y = df['has_heart_disease'].to_numpy(dtype=np.float64)
+    penalty = np.full(X.shape[1], float(l2))
+    penalty[0] = 0.0  # the intercept is not shrunk
+
+    weights = np.zeros(X.shape[1])
+    for _ in range(MODEL_MAX_ITERATIONS):
+        p = 1 / (1 + np.exp(-(X @ weights)))
+        gradient = X.T @ (p - y) + penalty * weights
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    model['weights'] = weights.tolist()
+    model['auc'] = roc_auc(y, X @ weights)
+    return model
+
+def roc_auc(y, scores):
+    """Area under the ROC curve (Mann-Whitney rank statistic, ties averaged)"""
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if positives == 0 or negatives == 0:
+        return float('nan')
+    ranks = pd.Series(scores).rank().to_numpy()
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+def score(frame, model):
+    """Disease probability of every row of a cleaned frame, in one vectorized pass"""
+    linear = _design_matrix(frame, model) @ np.asarray(model['weights'])
+    return 1 / (1 + np.exp(-linear))
+
+def score_raw_patients(raw, model):
+    """Probabilities for a raw frame (CSV layout, `num` optional) after the cleaning pipeline"""
+    if 'num' not in raw.columns:
+        raw = raw.assign(num=np.nan)
+    return score(clean_data(raw, model['fill_values']), model)
+
+def write_risk_model(model, path):
+    """Save a trained model as JSON"""
+    with open(path, 'w') as f:
+        json.dump(model, f, indent=2, default=_json_value)
+
+def read_risk_model(path):
+    """Load a model saved by write_risk_model"""
+    with open(path) as f:
+        return json.load(f)
+
+@st.cache_resource
+def get_risk_model(version, _state):
+    """Risk model trained on one data version, shared by every session
+
+    SQLite keeps the rows on disk, so the model is fit on the stratified sample (about
+    SAMPLE_ROWS rows) rather than a frame of the whole table.
+    """
+    if 'pool' in _state:
+        return train_risk_model(state_frame(get_sample_state(version, _state)), _state['fill_values'])
+    columns = MODEL_NUMERIC_FEATURES + MODEL_CATEGORICAL_FEATURES + ['has_heart_disease']
+    return train_risk_model(state_frame(_state, columns), _state['fill_values'])
+
+class ResultCache:
+    """Thread-safe LRU cache of per-view results shared by every session"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for `key` (refreshing its recency) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        """Whether `key` is cached, without counting a lookup or refreshing its recency"""
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value, size):
+        """Store `value`, evicting least recently used entries to respect both limits"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    """Process-wide result cache shared across sessions and reruns"""
+    return ResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+
+def _result_size(result):
+    """Approximate memory footprint (bytes) of cached aggregates or associations"""
+    size = 0
+    for value in result.values():
+        if isinstance(value, dict):
+            size += _result_size(value)
+        elif isinstance(value, pd.DataFrame):
+            size += int(value.memory_usage(deep=True).sum())
+        elif isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif isinstance(value, str):
+            size += len(value)
+        else:
+            size += 64
+    return size
+
+def view_key(state, age_range, selected_gender='All', selected_dataset='All', facets=None):
+    """Normalized cache key for a sidebar filter state on one version of the data"""
+    age_min, age_max = state_age_bounds(state)
+    lo = max(int(age_range[0]), age_min)
+    hi = min(int(age_range[1]), age_max)
+    facet_key = tuple(sorted((column, tuple(sorted(values, key=str)))
+                             for column, values in (facets or {}).items() if values))
+    return (state['version'], lo, hi, selected_gender, selected_dataset, facet_key)
+
+def _view_key(view):
+    """view_key of a view dict"""
+    return view_key(view['state'], view['age_range'], view['gender'], view['dataset'], view.get('facets'))
+
+def view_rows(view):
+    """Row positions matching a view's sidebar filters (in-memory backend)"""
+    state = view['state']
+    rows = filter_rows(state['index'], view['age_range'], {'sex': view['gender'], 'dataset': view['dataset']})
+    if any((view.get('facets') or {}).values()):
+        rows = facet_query(state['facets'], rows, view['facets'])[0]
+    return rows
+
+def get_facet_summary(view, cache=None):
+    """Matching row count and every facet option's live count for a filter state, cached"""
+    cache = cache or get_result_cache()
+    key = ('facets',) + _view_key(view)
+    summary = cache.get(key)
+    if summary is None:
+        state, facets = view['state'], view.get('facets') or {}
+        selections = {'sex': view['gender'], 'dataset': view['dataset']}
+        if 'pool' in state:
+            summary = {'total': query_sqlite_count(state, view['age_range'], selections, facets),
+                       'counts': query_sqlite_facets(state, view['age_range'], selections, facets)}
+        else:
+            rows = filter_rows(state['index'], view['age_range'], selections)
+            rows, counts = facet_query(state['facets'], rows, facets)
+            summary = scale_counts({'total': len(rows), 'counts': counts}, state.get('scale', 1))
+        cache.put(key, summary, _result_size(summary))
+    return summary
+
+def get_view_aggregates(view, cache=None):
+    """Aggregates for a filter state, served from the result cache
+
+    Without facet selections they come from the count cube; with them, from the matching
+    rows (the facet columns are not cube dimensions). On a sample state the counts are
+    scaled up, while the intervals keep the sample's (wider) spread.
+    """
+    cache = cache or get_result_cache()
+    key = ('aggregates',) + _view_key(view)
+    aggregates = cache.get(key)
+    if aggregates is None:
+        facets = view.get('facets') or {}
+        if 'pool' in view['state']:
+            aggregates = query_sqlite_aggregates(view['state'], key[2:4], view['gender'], view['dataset'], facets)
+        elif any(facets.values()):
+            aggregates = compute_aggregates(take_rows(view['state'], view_rows(view), AGGREGATE_COLUMNS))
+        else:
+            aggregates = query_count_cube(view['state']['cube'], key[2:4], view['gender'], view['dataset'])
+        # Confidence intervals are cached with the aggregates of each filter state
+        aggregates['intervals'] = confidence_intervals(aggregates)
+        if 'scale' in view['state']:
+            aggregates = scale_counts(aggregates, view['state']['scale'])
+        cache.put(key, aggregates, _result_size(aggregates))
+    return aggregates
+
+def _figures_size(figures):
+    """Approximate memory footprint (bytes) of cached figures: the size of their JSON specs"""
+    return sum(len(figure.to_json()) for figure in figures.values())
+
+def get_section_figures(view, builder, barmode='relative', cache=None):
+    """One section's figures for a filter state, served from the result cache
+
+    The cache holds the validated go.Figure objects (shared, so callers must not modify
+    them): a hit skips pandas and Plotly's figure validation. st.plotly_chart still copies
+    each figure to a dict and encodes it as JSON, a few milliseconds per section, since
+    it takes no pre-encoded spec.
+    """
+    cache = cache or get_result_cache()
+    key = (builder.__name__, barmode) + _view_key(view)
+    figures = cache.get(key)
+    if figures is None:
+        figures = builder(get_view_aggregates(view, cache), barmode)
+        cache.put(key, figures, _figures_size(figures))
+    return figures
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_association_codes(version, _state):
+    """Association codes (build_association_codes) of one data version, built on first use
+
+    Only the associations tab reads them, so a load or an append never pays for coding
+    every row; the first association query of a version does, once.
+    """
+    return build_association_codes(state_frame(_state, list(ASSOCIATION_CATEGORICAL) + list(DISTRIBUTION_COLUMNS)))
+
+def get_view_associations(view, cache=None):
+    """Association matrix and heart disease ranking for a filter state, served from the result cache
+
+    The SQLite backend holds no rows, so its associations come from the stratified sample
+    (the whole table when it is smaller than SAMPLE_ROWS).
+    """
+    cache = cache or get_result_cache()
+    if 'pool' in view['state']:
+        view = approximate_view(view)
+    key = ('associations',) + _view_key(view)
+    associations = cache.get(key)
+    if associations is None:
+        state = view['state']
+        codes = get_association_codes(state['version'], state)
+        rows = view_rows(view)
+        associations = association_matrix(take_rows(state, rows, codes['numeric']), codes, rows)
+        associations['outcome'] = rank_outcome_associations(associations)
+        associations['sample'] = ({'rows': state['n_rows'], 'population_rows': state['population_rows']}
+                                  if state.get('scale', 1) > 1 else None)
+        cache.put(key, associations, _result_size(associations))
+    return associations
+
+def get_association_figures(view, measure='strength', cache=None):
+    """Association figures for a filter state, served from the result cache (see get_section_figures)"""
+    cache = cache or get_result_cache()
+    key = ('association_figures', measure) + _view_key(view)
+    figures = cache.get(key)
+    if figures is None:
+        figures = build_association_figures(get_view_associations(view, cache), measure)
+        cache.put(key, figures, _figures_size(figures))
+    return figures
+
+@profiled()
+def create_overview_metrics(aggregates):
+    """Create overview metrics cards with icons"""
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f'''
+        <div class="metric-card">
+            <div class="metric-value">{aggregates['total']:,}</div>
+            <div class="metric-label">👥 Total Patients</div>
+        </div>
+        ''', unsafe_allow_html=True)
+
+    with col2:
+        heart_disease_count = aggregates['heart_disease_count']
+        heart_disease_rate = aggregates['heart_disease_rate']
+        st.markdown(f'''
+        <div class="metric-card">
+            <div class="metric-value">{heart_disease_count:,}</div>
+            <div class="metric-label">🫀 Heart Cases ({heart_disease_rate:.1f}%)</div>
+        </div>
+        ''', unsafe_allow_html=True)
+
+    with col3:
+        avg_age = aggregates['avg_age']
+        st.markdown(f'''
+        <div class="metric-card">
+            <div class="metric-value">{avg_age:.1f}</div>
+            <div class="metric-label">📅 Avg Age (years)</div>
+        </div>
+        ''', unsafe_allow_html=True)
+
+    with col4:
+        male_count = aggregates['male_count']
+        male_percentage = (male_count / aggregates['total']) * 100 if aggregates['total'] else 0
+        st.markdown(f'''
+        <div class="metric-card">
+            <div class="metric-value">{male_count:,}</div>
+            <div class="metric-label">👨 Male Patients ({male_percentage:.1f}%)</div>
+        </div>
+        ''', unsafe_allow_html=True)
+
+def profiled_bar(data_frame, **kwargs):
+    """px.bar, recorded as a 'px.bar' profiler span"""
+    with profile_span('px.bar', rows=len(data_frame)):
+        return px.bar(data_frame, **kwargs)
+
+def build_demographic_figures(aggregates, barmode='relative'):
+    """Build the demographic analysis figures"""
+    # Heart disease distribution by age group with themed colors
+    age_disease = aggregates['age_group']
+    
+    age_fig = profiled_bar(age_disease, x='age_group', y='count', color='heart_disease_label',
+                title='Heart Disease Distribution by Age Group',
+                labels={'age_group': 'Age Group', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                text='percentage')
+    
+    # Add percentage labels inside bars
+    age_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    age_fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)', barmode=barmode)
+    
+    # Gender distribution by heart disease with custom colors
+    gender_disease = aggregates['sex']
+    
+    # Create bar chart with themed colors
+    gender_fig = profiled_bar(gender_disease, x='sex', y='count', color='heart_disease_label',
+                title='Heart Disease Distribution by Gender',
+                labels={'heart_disease_label': 'Heart Disease', 'count': 'Number of Patients'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                text='percentage')
+    
+    # Add percentage labels inside bars
+    gender_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    gender_fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)', barmode=barmode)
+    
+    return {'age_group': age_fig, 'sex': gender_fig}
+
+@profiled()
+def create_demographic_analysis(figures):
+    """Create demographic analysis visualizations"""
+    st.markdown('<div class="section-header">👥 Demographic Analysis</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(figures['age_group'], use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(figures['sex'], use_container_width=True)
+
+def build_clinical_figures(aggregates, barmode='relative'):
+    """Build the clinical parameters figures"""
+    # Chest pain analysis with varied colors
+    cp_disease = aggregates['cp']
+    
+    cp_fig = profiled_bar(cp_disease, x='cp', y='count', color='heart_disease_label',
+                title='Heart Disease Distribution by Chest Pain Type',
+                labels={'cp': 'Chest Pain Type', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                text='percentage')
+    
+    # Add percentage labels inside bars
+    cp_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    cp_fig.update_xaxes(tickangle=45)
+    cp_fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)', barmode=barmode)
+    
+    # Cholesterol categories by heart disease with purple theme
+    chol_disease = aggregates['chol_category']
+    
+    chol_fig = profiled_bar(chol_disease, x='chol_category', y='count', color='heart_disease_label',
+                title='Heart Disease Distribution by Cholesterol Category',
+                labels={'chol_category': 'Cholesterol Category', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                text='percentage')
+    
+    # Add percentage labels inside bars
+    chol_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    chol_fig.update_xaxes(tickangle=45)
+    chol_fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)', barmode=barmode)
+    
+    return {'cp': cp_fig, 'chol_category': chol_fig}
+
+@profiled()
+def create_clinical_analysis(figures):
+    """Create clinical parameters analysis"""
+    st.markdown('<div class="section-header">🏥 Clinical Parameters Analysis</div>', unsafe_allow_html=True)
+
+    # First row - Chest Pain and Cholesterol Box Plot
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(figures['cp'], use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(figures['chol_category'], use_container_width=True)
+
+def build_risk_factors_figures(aggregates, barmode='relative'):
+    """Build the risk factors figures"""
+    # Risk factors by categories (cholesterol, BP, fasting blood sugar) with gradient colors
+    risk_df = aggregates['risk'].copy()
+    risk_df['Risk_Text'] = risk_df['Risk'].round(1)
+    
+    # Bootstrap confidence intervals as error bars, when the aggregates carry them
+    error_bars = {}
+    if 'intervals' in aggregates:
+        bounds = aggregates['intervals']['risk']
+        risk_df['ci_plus'] = (bounds['high'] - risk_df['Risk']).clip(lower=0).to_numpy()
+        risk_df['ci_minus'] = (risk_df['Risk'] - bounds['low']).clip(lower=0).to_numpy()
+        error_bars = {'error_x': 'ci_plus', 'error_x_minus': 'ci_minus'}
+    
+    # Use a medical-themed color scale
+    risk_fig = profiled_bar(risk_df, x='Risk', y='Category', orientation='h',
+                title=f'Heart Disease Risk by Categories (%, {CONFIDENCE_LEVEL:.0%} CI)' if error_bars else 'Heart Disease Risk by Categories (%)',
+                color='Risk', 
+                color_continuous_scale=[[0, MEDICAL_COLORS['success']], 
+                                      [0.5, MEDICAL_COLORS['warning']], 
+                                      [1, MEDICAL_COLORS['primary']]],
+                text='Risk_Text',
+                **error_bars)
+    
+    # Add percentage labels inside bars
+    risk_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    risk_fig.update_layout(height=500, plot_bgcolor='rgba(0,0,0,0)')
+    
+    # Exercise-induced angina with teal colors
+    exang_disease = aggregates['exang_label']
+    
+    # Define colors for exercise-induced angina
+    exang_colors = {'No': MEDICAL_COLORS['light_green'], 'Yes': MEDICAL_COLORS['navy']}
+    
+    exang_fig = profiled_bar(exang_disease, x='exang_label', y='count', color='heart_disease_label',
+                title='Heart Disease Distribution by Exercise-Induced Angina',
+                labels={'exang_label': 'Exercise-Induced Angina', 'count': 'Number of Patients', 'heart_disease_label': 'Heart Disease'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                text='percentage')
+    
+    # Add percentage labels inside bars
+    exang_fig.update_traces(texttemplate='%{text}%', textposition='inside')
+    exang_fig.update_layout(height=400, plot_bgcolor='rgba(0,0,0,0)', barmode=barmode)
+    
+    return {'risk': risk_fig, 'exang_label': exang_fig}
+
+@profiled()
+def create_risk_factors_analysis(figures):
+    """Analyze risk factors correlation"""
+    st.markdown('<div class="section-header">⚠️ Risk Factors Analysis</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(figures['risk'], use_container_width=True)
+        
+    with col2:
+        st.plotly_chart(figures['exang_label'], use_container_width=True)
+
+def range_edges(lo, hi, bins=DISTRIBUTION_BINS):
+    """`bins` equal-width bins spanning [lo, hi] (a column's full range, so histograms of every filter line up)"""
+    return np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+
+def distribution_counts(values, outcome, edges):
+    """Histogram counts per outcome (row 0: no disease, row 1: disease) in one bincount pass"""
+    bins = len(edges) - 1
+    valid = np.isfinite(values)
+    # Bins are closed on the left except the last, which also takes the maximum
+    codes = np.clip(np.searchsorted(edges, values[valid], side='right') - 1, 0, bins - 1)
+    cells = outcome[valid].astype(np.int64) * bins + codes
+    return np.bincount(cells, minlength=2 * bins).reshape(2, bins)
+
+def build_distribution_figure(counts, edges, column, density=False):
+    """Build an outcome-split histogram from precomputed bin counts"""
+    bins = len(edges) - 1
+    widths = np.diff(edges)
+    values = counts.astype(float)
+    if density:
+        totals = counts.sum(axis=1, keepdims=True)
+        values = np.divide(values, totals * widths, out=np.zeros_like(values), where=totals > 0)
+    dist_df = pd.DataFrame({
+        'bin': np.tile((edges[:-1] + edges[1:]) / 2, 2),
+        'value': values.ravel(),
+        'heart_disease_label': np.repeat(['No Heart Disease', 'Heart Disease'], bins),
+    })
+
+    y_label = 'Density' if density else 'Number of Patients'
+    dist_fig = profiled_bar(dist_df, x='bin', y='value', color='heart_disease_label',
+                title=f'Distribution of {DISTRIBUTION_COLUMNS[column]} by Heart Disease',
+                labels={'bin': DISTRIBUTION_COLUMNS[column], 'value': y_label, 'heart_disease_label': 'Heart Disease'},
+                color_discrete_map=HEART_DISEASE_COLORS,
+                opacity=0.7)
+    dist_fig.update_traces(width=float(widths[0]))
+    dist_fig.update_layout(height=450, plot_bgcolor='rgba(0,0,0,0)', barmode='overlay', bargap=0)
+    return dist_fig
+
+@profiled()
+def create_distribution_analysis(figure):
+    """Create the continuous variable distribution view"""
+    st.markdown('<div class="section-header">📈 Distribution Analysis</div>', unsafe_allow_html=True)
+    st.plotly_chart(figure, use_container_width=True)
+
+# Heatmap choices of the association section
+ASSOCIATION_MEASURES = {'Association strength': 'strength', 'Mutual information (bits)': 'mutual_information'}
+
+def build_association_figures(associations, measure='strength'):
+    """Association heatmap of every variable pair plus the heart disease ranking"""
+    labels = [association_label(column) for column in associations['columns']]
+    matrix = associations[measure]
+    scale = [[0, MEDICAL_COLORS['success']], [0.5, MEDICAL_COLORS['warning']], [1, MEDICAL_COLORS['primary']]]
+    matrix_fig = px.imshow(matrix.round(3), x=labels, y=labels, text_auto='.2f', aspect='auto',
+                           zmin=0, zmax=1 if measure == 'strength' else None, color_continuous_scale=scale,
+                           title='Association Between Variables' if measure == 'strength' else
+                           'Mutual Information Between Variables (bits; diagonal: entropy)')
+    matrix_fig.update_layout(height=600, plot_bgcolor='rgba(0,0,0,0)')
+
+    ranking = associations['outcome']
+    value = 'Association' if measure == 'strength' else 'Mutual Information (bits)'
+    outcome_fig = profiled_bar(ranking, x=value, y='Variable', orientation='h', color='Measure',
+                               title='Association with Heart Disease (strongest first)',
+                               hover_data=['Strength', 'Mutual Information (bits)'],
+                               color_discrete_sequence=CHEST_PAIN_COLORS)
+    outcome_fig.update_yaxes(categoryorder='array', categoryarray=list(ranking['Variable'][::-1]))
+    outcome_fig.update_layout(height=450, plot_bgcolor='rgba(0,0,0,0)')
+    return {'matrix': matrix_fig, 'outcome': outcome_fig}
+
+@profiled()
+def create_association_analysis(figures, associations):
+    """Show how every variable relates to heart disease and to the others"""
+    st.markdown('<div class="section-header">🔗 Association Analysis</div>', unsafe_allow_html=True)
+    st.plotly_chart(figures['matrix'], use_container_width=True)
+    st.plotly_chart(figures['outcome'], use_container_width=True)
+    sample = associations['sample']
+    source = (f"a stratified sample of {sample['rows']:,} of {sample['population_rows']:,} patients"
+              if sample else f"{associations['n_rows']:,} patients")
+    st.caption(f"From {source}. Cramér's V between categorical variables, Spearman's ρ between numeric ones, "
+               f"and the correlation ratio η (the signed point-biserial r for a yes/no variable) between the two; "
+               f"mutual information uses {ASSOCIATION_BINS} quantile bins per numeric variable.")
+
+@profiled()
+def create_insights_and_recommendations(aggregates, associations=None):
+    """Generate insights and recommendations"""
+    st.markdown('<div class="section-header">💡 Key Insights & Recommendations</div>', unsafe_allow_html=True)
+    
+    # Key statistics are precomputed by the aggregation layer
+    heart_disease_rate = aggregates['heart_disease_rate']
+    male_disease_rate = aggregates['male_disease_rate']
+    female_disease_rate = aggregates['female_disease_rate']
+    avg_age_disease = aggregates['avg_age_disease']
+    avg_age_no_disease = aggregates['avg_age_no_disease']
+    highest_risk_cp = aggregates['highest_risk_cp']
+    highest_risk_cp_rate = aggregates['highest_risk_cp_rate']
+    intervals = aggregates.get('intervals', {})
+
+    def ci(key):
+        """Bootstrap interval suffix for a quoted percentage"""
+        if key not in intervals or np.isnan(intervals[key][0]):
+            return ''
+        low, high = intervals[key]
+        return f" ({CONFIDENCE_LEVEL:.0%} CI {low:.1f}–{high:.1f}%)"
+
+    st.markdown('<div class="insight-box">', unsafe_allow_html=True)
+    st.markdown("**🔍 Key Findings:**")
+    st.markdown(f"""
+    - **Overall Risk**: {heart_disease_rate:.1f}%{ci('heart_disease_rate')} of patients have heart disease
+    - **Gender Disparity**: Males have {male_disease_rate:.1f}%{ci('male_disease_rate')} risk vs females {female_disease_rate:.1f}%{ci('female_disease_rate')}
+    - **Age Factor**: Patients with heart disease are on average {avg_age_disease - avg_age_no_disease:.1f} years older
+    - **Highest Risk**: {highest_risk_cp} chest pain type has {highest_risk_cp_rate:.1f}%{ci('highest_risk_cp_rate')} risk
+    """)
+
+    # Risk factor findings are generated from the ranked associations with heart disease
+    ranking = associations['outcome'].dropna(subset=['Strength']) if associations is not None else []
+    if len(ranking):
+        def describe(row):
+            return (f"{row['Variable']} ({row['Measure']} {row['Association']:.2f}, "
+                    f"{association_strength(row['Association'])})")
+        strongest = ranking.head(3)
+        findings = [f"- **Strongest Associations**: {', '.join(describe(row) for _, row in strongest.iterrows())}"]
+        exang = ranking.index[ranking['column'] == 'exang']
+        if len(exang):
+            row = ranking.loc[exang[0]]
+            findings.append(f"- **Exercise Response**: Exercise-induced angina ranks #{exang[0] + 1} of "
+                            f"{len(ranking)} variables ({row['Measure']} {row['Association']:.2f}, "
+                            f"{association_strength(row['Association'])} association)")
+        weakest = ranking.iloc[-1]
+        findings.append(f"- **Weakest Association**: {describe(weakest)}")
+        st.markdown('\n'.join(findings))
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Figure builders behind the dashboard sections (precomputed by the warm-up)
+SECTION_FIGURE_BUILDERS = [build_demographic_figures, build_clinical_figures, build_risk_factors_figures]
+
+def get_distribution_figure(view, column, density=False, cache=None):
+    """Histogram of one continuous column for a filter state, served from the result cache
+
+    Bins are counted server-side over the filtered rows; the figure holds only bin
+    centers and counts, so its size does not depend on how many rows match. Cached as a
+    validated go.Figure, like the section figures (see get_section_figures).
+    """
+    cache = cache or get_result_cache()
+    state = view['state']
+    key = ('distribution', column, density) + _view_key(view)
+    figure = cache.get(key)
+    if figure is None:
+        selections = {'sex': view['gender'], 'dataset': view['dataset']}
+        if 'pool' in state:
+            edges = range_edges(*state['column_ranges'][column])
+            counts = query_sqlite_distribution(state, column, edges, view['age_range'], selections, view.get('facets'))
+        else:
+            # Only the matching rows of the two columns are gathered, as stored (no float64 copy)
+            edges = range_edges(*state['column_ranges'][column])
+            rows = take_rows(state, view_rows(view), [column, 'has_heart_disease'])
+            counts = distribution_counts(rows[column].to_numpy(), rows['has_heart_disease'].to_numpy(), edges)
+            counts = counts * state.get('scale', 1)
+        figure = build_distribution_figure(counts, edges, column, density)
+        cache.put(key, figure, _figures_size({column: figure}))
+    return figure
+
+def warmup_views(state):
+    """Filter views the warm-up precomputes for one data version"""
+    full_range = state_age_bounds(state)
+    genders = ['All'] + state_options(state, 'sex')
+    datasets = ['All'] + state_options(state, 'dataset')
+    return [{'state': state, 'age_range': age_range, 'gender': gender, 'dataset': dataset}
+            for age_range in [full_range] + POPULAR_AGE_RANGES
+            for gender in genders
+            for dataset in datasets]
+
+def warm_view(view, cache):
+    """Fill the result cache with a view's aggregates and every section's default figures"""
+    get_view_aggregates(view, cache)
+    for builder in SECTION_FIGURE_BUILDERS:
+        get_section_figures(view, builder, cache=cache)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup(version, _state):
+    """Precompute popular views of one data version on a background thread pool
+
+    Runs once per data version; sessions never wait for it, and a view requested
+    before its turn is simply computed (and cached) by that session.
+    """
+    # Workers get the cache handed over; they have no script context to resolve it in
+    cache = get_result_cache()
+    executor = ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix='warmup')
+    futures = [executor.submit(warm_view, view, cache) for view in warmup_views(_state)]
+    executor.shutdown(wait=False)
+    return futures
+
+@st.cache_resource
+def start_background_load():
+    """Load the data store and warm the result cache on a background thread, once per process
+
+    Kicked off by the first script run, the login page's included, so the first user after
+    a deploy finds the data loaded and the popular views cached. No run waits for it; a
+    session needing the store before it is ready waits in get_data_store instead. (The
+    resources built here show no spinner: that needs the script context the thread lacks.)
+    """
+    def load():
+        state = start_source_watcher().store.state
+        start_warmup(state['version'], state)
+
+    thread = threading.Thread(target=load, name='startup-load', daemon=True)
+    thread.start()
+    return thread
+
+def needs_progressive(view):
+    """Whether a view's exact answer scans rows of a large extract (facets or SQLite)
+
+    Plain sidebar filters on the in-memory backend are answered from the count cube in
+    constant time, so only row-scanning views render from the sample first.
+    """
+    state = view['state']
+    scans_rows = 'pool' in state or any((view.get('facets') or {}).values())
+    return scans_rows and state['n_rows'] >= PROGRESSIVE_MIN_ROWS
+
+def approximate_view(view):
+    """The same filters over the stratified sample of the view's data version"""
+    return dict(view, state=get_sample_state(view['state']['version'], view['state']))
+
+def compute_exact_view(view, cache, distribution_column=None):
+    """Fill the result cache with a view's exact summary, aggregates and section figures"""
+    get_facet_summary(view, cache)
+    warm_view(view, cache)
+    if distribution_column is not None:
+        get_distribution_figure(view, distribution_column, cache=cache)
+
+class ExactJobs:
+    """Background exact computations, at most one in flight per view key"""
+
+    def __init__(self, workers=EXACT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='exact')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        """Future of the job for `key`, started unless one is already running or done"""
+        with self._lock:
+            # Finished jobs have filled the result cache (or failed, and may be retried)
+            for done_key in [k for k, job in self._jobs.items() if k != key and job.done()]:
+                del self._jobs[done_key]
+            if key not in self._jobs:
+                self._jobs[key] = self._executor.submit(func, *args)
+            return self._jobs[key]
+
+@st.cache_resource
+def get_exact_jobs():
+    """Process-wide background workers computing exact views (deduplicated across sessions)"""
+    return ExactJobs()
+
+@st.fragment(run_every=PROGRESSIVE_POLL_SECONDS)
+def exact_results_poller(job):
+    """Rerun the page as soon as the background exact pass has finished"""
+    if job.done():
+        st.rerun()
+
+def section_barmode(section):
+    """Section-local control for how the outcome bars are drawn"""
+    label = st.radio("Bars", list(BAR_MODES), horizontal=True, key=f"{section}_barmode")
+    return BAR_MODES[label]
+
+@st.fragment
+def demographic_section(view):
+    """Demographics tab; its own control reruns only this fragment"""
+    barmode = section_barmode('demographic')
+    create_demographic_analysis(get_section_figures(view, build_demographic_figures, barmode))
+
+@st.fragment
+def clinical_section(view):
+    """Clinical tab; its own control reruns only this fragment"""
+    barmode = section_barmode('clinical')
+    create_clinical_analysis(get_section_figures(view, build_clinical_figures, barmode))
+
+@st.fragment
+def risk_factors_section(view):
+    """Risk factors tab; its own control reruns only this fragment"""
+    barmode = section_barmode('risk_factors')
+    create_risk_factors_analysis(get_section_figures(view, build_risk_factors_figures, barmode))
+
+@st.fragment
+def distribution_section(view):
+    """Distributions tab; its variable and scale controls rerun only this fragment"""
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        column = st.selectbox("Variable", list(DISTRIBUTION_COLUMNS), format_func=DISTRIBUTION_COLUMNS.get,
+                              key="distribution_column")
+    with col2:
+        scale = st.radio("Scale", ['Counts', 'Density'], horizontal=True, key="distribution_scale")
+    create_distribution_analysis(get_distribution_figure(view, column, scale == 'Density'))
+
+def associations_view(view):
+    """The view to show associations for now
+
+    Associations scan the matching rows even without facets, so on a large in-memory
+    extract the stratified sample stands in while a background worker computes the exact
+    matrix; a poller reruns the page once it is cached.
+    """
+    state = view['state']
+    if 'pool' in state or 'scale' in state or state['n_rows'] < PROGRESSIVE_MIN_ROWS:
+        return view
+    cache = get_result_cache()
+    key = ('associations',) + _view_key(view)
+    if key in cache:
+        return view
+    job = get_exact_jobs().submit(key, get_view_associations, view, cache)
+    if job.done():
+        return view
+    exact_results_poller(job)
+    return approximate_view(view)
+
+@st.fragment
+def association_section(view):
+    """Associations tab; its measure control reruns only this fragment"""
+    label = st.radio("Measure", list(ASSOCIATION_MEASURES), horizontal=True, key="association_measure")
+    view = associations_view(view)
+    create_association_analysis(get_association_figures(view, ASSOCIATION_MEASURES[label]), get_view_associations(view))
+
+@st.fragment
+def insights_section(view):
+    """Insights tab"""
+    create_insights_and_recommendations(get_view_aggregates(view), get_view_associations(associations_view(view)))
+
+# Form labels of the risk model's inputs
+MODEL_FEATURE_LABELS = {
+    'age': 'Age (years)',
+    'sex': 'Sex',
+    'cp': 'Chest Pain Type',
+    'trestbps': 'Resting Blood Pressure (mm Hg)',
+    'chol': 'Serum Cholesterol (mg/dl)',
+    'fbs': 'Fasting Blood Sugar',
+    'thalch': 'Maximum Heart Rate (bpm)',
+    'exang': 'Exercise-Induced Angina',
+    'oldpeak': 'ST Depression (oldpeak)',
+}
+# Flag levels as shown in the form (levels are stored as strings, see _model_levels)
+MODEL_LEVEL_LABELS = {'True': 'Yes', 'False': 'No'}
+
+@st.fragment
+def risk_score_section(view):
+    """Score-a-patient tab; submitting the form reruns only this fragment"""
+    state = view['state']
+    model = get_risk_model(state['version'], state)
+    st.markdown('<h2 class="section-header">🩺 Score a Patient</h2>', unsafe_allow_html=True)
+
+    with st.form("risk_score_form"):
+        patient = {}
+        col1, col2 = st.columns(2)
+        for i, col in enumerate(model['numeric']):
+            lo, hi = model['ranges'][col]
+            with (col1 if i % 2 == 0 else col2):
+                patient[col] = st.number_input(MODEL_FEATURE_LABELS[col], min_value=lo, max_value=hi,
+                                               value=round(model['means'][col], 1), key=f"risk_{col}")
+        for i, (col, levels) in enumerate(model['levels'].items()):
+            with (col1 if i % 2 == 0 else col2):
+                patient[col] = st.selectbox(MODEL_FEATURE_LABELS[col], levels,
+                                            format_func=lambda v: MODEL_LEVEL_LABELS.get(v, v),
+                                            key=f"risk_{col}")
+        submitted = st.form_submit_button("Score")
+
+    if submitted:
+        probability = score(pd.DataFrame([patient]), model)[0]
+        st.metric("Estimated heart disease probability", f"{probability:.1%}")
+    st.caption(f"Logistic regression on {model['n_train']:,} patients (in-sample AUC {model['auc']:.2f}); "
+               f"a statistical estimate from this dataset, not a diagnosis.")
+
+# Dashboard tabs and the fragment rendering each one
+SECTION_TABS = {
+    '👥 Demographics': demographic_section,
+    '🏥 Clinical': clinical_section,
+    '⚠️ Risk Factors': risk_factors_section,
+    '📈 Distributions': distribution_section,
+    '🔗 Associations': association_section,
+    '💡 Insights': insights_section,
+    '🩺 Risk Score': risk_score_section,
+}
+
+# How flag and boolean facet options are shown
+FACET_VALUE_LABELS = {False: 'No', True: 'Yes'}
+
+def facet_filters(facet_labels, summary):
+    """Sidebar multi-selects of the facet filters, each option labelled with its live count"""
+    for column, label in FACET_COLUMNS.items():
+        counts = summary['counts'][column]
+        st.multiselect(label, facet_labels[column], key=f"facet_{column}",
+                       format_func=lambda value, counts=counts: f"{FACET_VALUE_LABELS.get(value, value)} ({counts.get(value, 0):,})")
+
+def data_refreshed_caption(state, watcher):
+    """When (and how) the data shown was last refreshed, plus any failed source check"""
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(state['refreshed_at']))
+    caption = f"🔄 Data refreshed at {stamp}: {state['last_update']}"
+    if watcher.last_error:
+        caption += f"; the latest refresh failed, still showing this version ({watcher.last_error})"
+    return caption
+
+def session_memory_caption():
+    """Memory held by this session (its state) and allocated by its previous rerun"""
+    state_bytes = _result_size(dict(st.session_state))
+    allocated = st.session_state.get('rerun_allocated_bytes')
+    if allocated is None:
+        rerun = "set DASHBOARD_PROFILE=1 and DASHBOARD_PROFILE_ALLOCATIONS=1 to trace rerun allocations"
+    else:
+        rerun = f"previous rerun allocated {allocated / 1024:,.1f} KiB at peak"
+    return f"This session: {state_bytes / 1024:,.1f} KiB of session state; {rerun}"
+
+def create_debug_panel(profiler):
+    """Sidebar panel with hot-path timings and result cache counters"""
+    with st.expander("🛠️ Debug: Performance"):
+        summary = profiler.summary()
+        rerun = summary[summary['span'] == 'rerun']
+        if len(rerun):
+            st.caption(f"Rerun p95: {rerun['p95_ms'].iloc[0]:,.1f} ms over {rerun['calls'].iloc[0]:,} reruns")
+        st.dataframe(summary.round(2), hide_index=True, use_container_width=True)
+        cache = get_result_cache().stats()
+        st.caption(f"Result cache: {cache['entries']} entries, {cache['bytes'] / 1024:,.1f} KiB, "
+                   f"{cache['hit_rate']:.0%} hits ({cache['hits']} / {cache['hits'] + cache['misses']}), "
+                   f"{cache['evictions']} evictions")
+        st.caption(f"Metrics written to {PROFILE_EXPORT_PATH}")
+
+def logout():
+    """Clear session state to logout"""
+    st.session_state["password_correct"] = False
+    st.rerun()
+
+def main():
+    # Check if user is authenticated
+    if not check_password():
         return
     
-    # Add logout button in sidebar
+    st.markdown(PAGE_STYLE, unsafe_allow_html=True)
+
+    # Add logout button in sidebar (the debug panel is filled in once the rerun is timed)
     with st.sidebar:
         st.markdown("---")
         if st.button("🔐 Logout", key="logout_btn"):
             logout()
+        debug_panel = st.container() if PROFILING_ENABLED else None
     
-    st.markdown('''
-        <div class="main-header">
-            <span style="color:white;">MSBA 382 Project</span><br>🫀 Heart Disease Analysis Dashboard
-        </div>
-    ''', unsafe_allow_html=True)
+    st.markdown(MAIN_HEADER_HTML, unsafe_allow_html=True)
 
     
-    # Load data
-    try:
-        df = load_data()
+    with profile_span('rerun') as rerun:
+        # Load data
+        try:
+            # Changes to the CSV are picked up by the background watcher; each rerun reads
+            # one consistent state, the previous one until a rebuild has been swapped in
+            watcher = start_source_watcher()
+            state = watcher.store.state
+            start_warmup(state['version'], state)
+            _startup.mark('data store')
         
-        # Sidebar with filters
-        st.sidebar.title("🔧 Filters")
-        # Filters
-        age_range = st.sidebar.slider("Age Range", int(df['age'].min()), int(df['age'].max()), 
-                                     (int(df['age'].min()), int(df['age'].max())))
-        selected_gender = st.sidebar.selectbox("Gender", ['All'] + list(df['sex'].unique()))
-        selected_dataset = st.sidebar.selectbox("Dataset", ['All'] + list(df['dataset'].unique()))
+            # Sidebar with filters
+            st.sidebar.title("🔧 Filters")
+            # Filters (bounds and options come from the filter index or the database metadata,
+            # not a fresh scan of the data)
+            age_min, age_max = state_age_bounds(state)
+            age_range = st.sidebar.slider("Age Range", age_min, age_max, (age_min, age_max))
+            selected_gender = st.sidebar.selectbox("Gender", ['All'] + state_options(state, 'sex'))
+            selected_dataset = st.sidebar.selectbox("Dataset", ['All'] + state_options(state, 'dataset'))
         
-        # Apply filters
-        filtered_df = df[(df['age'] >= age_range[0]) & (df['age'] <= age_range[1])]
-        if selected_gender != 'All':
-            filtered_df = filtered_df[filtered_df['sex'] == selected_gender]
-        if selected_dataset != 'All':
-            filtered_df = filtered_df[filtered_df['dataset'] == selected_dataset]
+            # Facet selections are read ahead of their widgets, whose labels need the counts
+            facet_labels = state_facet_labels(state)
+            facets = {column: [value for value in st.session_state.get(f"facet_{column}", []) if value in facet_labels[column]]
+                      for column in FACET_COLUMNS}
+            view = {'state': state, 'age_range': age_range, 'gender': selected_gender, 'dataset': selected_dataset,
+                    'facets': facets}
+
+            # Row-scanning views of a large extract render from the stratified sample first,
+            # while a background worker fills the result cache with the exact results
+            job = None
+            cache = get_result_cache()
+            if needs_progressive(view) and not (('aggregates',) + _view_key(view) in cache
+                                                and ('facets',) + _view_key(view) in cache):
+                distribution_column = st.session_state.get('distribution_column', next(iter(DISTRIBUTION_COLUMNS)))
+                job = get_exact_jobs().submit(_view_key(view), compute_exact_view, view, cache, distribution_column)
+            # A finished (or failed) job means the exact view is served (or computed) right away
+            progressive = job is not None and not job.done()
+            render_view = approximate_view(view) if progressive else view
+
+            # Apply filters: bitmap AND over the indexes, then one bincount over the coded facet
+            # columns (or indexed SQL counts) gives the matches and every option's count
+            with profile_span('filter', rows=render_view['state']['n_rows']):
+                summary = get_facet_summary(render_view)
+                filtered_count = summary['total']
+            with st.sidebar.expander("🔎 More Filters", expanded=any(facets.values())):
+                facet_filters(facet_labels, summary)
         
-        if len(filtered_df) != len(df):
-            st.sidebar.info(f"Showing {len(filtered_df)} records")
+            if filtered_count != state['n_rows']:
+                st.sidebar.info(f"Showing {'≈' if progressive else ''}{filtered_count:,} records")
+
+            if progressive:
+                aggregates = get_view_aggregates(render_view)
+                low, high = aggregates['intervals']['heart_disease_rate']
+                st.info(f"⏳ Approximate results from a stratified sample of {render_view['state']['n_rows']:,} "
+                        f"of {state['n_rows']:,} patients: heart disease rate {aggregates['heart_disease_rate']:.1f}% "
+                        f"± {(high - low) / 2:.1f} points ({CONFIDENCE_LEVEL:.0%} CI). "
+                        f"Exact results are being computed and will replace these automatically.")
+                exact_results_poller(job)
+        
+            st.sidebar.caption(data_refreshed_caption(state, watcher))
+
+            with st.sidebar.expander("💾 Memory Usage"):
+                if 'pool' in state:
+                    st.caption(f"SQLite backend: {os.path.getsize(state['db_path']) / 1024:,.1f} KiB on disk, "
+                               f"no rows held in memory")
+                else:
+                    report = load_memory_report(state['version'])
+                    st.caption(f"Cleaned dataset: {report['bytes'].sum() / 1024:,.1f} KiB")
+                    st.dataframe(report, hide_index=True, use_container_width=True)
+                st.caption(session_memory_caption())
         
-        # Main dashboard sections
-        create_overview_metrics(filtered_df)
-        create_demographic_analysis(filtered_df)
-        create_clinical_analysis(filtered_df)
-        create_risk_factors_analysis(filtered_df)
-        create_insights_and_recommendations(filtered_df)
+            # Aggregates (from the count cube) and figures are shared across sessions;
+            # compute_aggregates(take_rows(state, view_rows(view))) yields the same aggregates
+            create_overview_metrics(get_view_aggregates(render_view))
         
-    except FileNotFoundError:
-        st.error("❌ Error: Could not find 'heart_disease_uci.csv' file. Please ensure the file is in the correct location.")
-        st.info("💡 To use this dashboard:")
-        st.markdown("""
-        1. Download the Heart Disease UCI dataset
-        2. Save it as 'heart_disease_uci.csv' in the same directory as this script
-        3. Restart the Streamlit application
-        """)
-    
-    except Exception as e:
-        st.error(f"❌ An error occurred while loading the data: {str(e)}")
-        st.info("Please check your data file format and try again.")
+            # Main dashboard sections: only the open tab runs, and each section's own
+            # controls rerun just its fragment
+            tabs = st.tabs(list(SECTION_TABS), key="section_tab", on_change="rerun")
+            for tab, render_section in zip(tabs, SECTION_TABS.values()):
+                if tab.open:
+                    with tab:
+                        # The risk model is always trained on the full data
+                        render_section(view if render_section is risk_score_section else render_view)
+        
+        except FileNotFoundError:
+            st.error("❌ Error: Could not find 'heart_disease_uci.csv' file. Please ensure the file is in the correct location.")
+            st.info("💡 To use this dashboard:")
+            st.markdown("""
+            1. Download the Heart Disease UCI dataset
+            2. Save it as 'heart_disease_uci.csv' in the same directory as this script
+            3. Restart the Streamlit application
+            """)
+    
+        except Exception as e:
+            st.error(f"❌ An error occurred while loading the data: {str(e)}")
+            st.info("Please check your data file format and try again.")
+    st.session_state['rerun_allocated_bytes'] = rerun.get('allocated')
+
+    if PROFILING_ENABLED:
+        profiler = get_profiler()
+        with debug_panel:
+            try:
+                profiler.export(PROFILE_EXPORT_PATH)
+            except OSError as e:
+                st.warning(f"Could not write metrics to {PROFILE_EXPORT_PATH}: {e}")
+            create_debug_panel(profiler)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    _startup.mark('module definitions')
+    start_background_load()
+    _startup.mark('background load started')
+    if LOGIN_ONLY:
+        # Painted at 'login page'; the phases after it ran behind the form
+        _startup.report('login', startup_runs_reported())
+        st.stop()
+    main()
+    _startup.mark('dashboard')
+    _startup.report('dashboard', startup_runs_reported())
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""Headless benchmarks of data loading and every dashboard section
+
+Streamlit is replaced by a no-op stub (see headless.py), so the app module runs without a server.
+Synthetic datasets are resampled from the real CSV at each requested scale and
+every stage reports latency percentiles and peak traced memory as JSON.
+
+Run with: python benchmark.py --scales 1,100,10000,100000 --output bench.json
+Compare against the pre-refactor aggregation with: python benchmark.py --compare-legacy
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import headless
+
+
+app = headless.load_app()
+
+
+# Columns read by the aggregation layer, the facet filters and the association matrix
+# (the rest only inflate the synthetic frame)
+AGGREGATE_COLUMNS = list(dict.fromkeys(['age', 'age_group'] + app.CUBE_DIMENSIONS + list(app.FACET_COLUMNS)
+                                       + list(app.ASSOCIATION_CATEGORICAL) + list(app.DISTRIBUTION_COLUMNS)))
+
+# Default dataset sizes, as multiples of the real CSV
+DEFAULT_SCALES = [1, 100, 10_000, 100_000]
+
+# Above this many rows the synthetic CSV is not written and load_data is skipped;
+# the later stages then run on a frame resampled from the cleaned 1x data
+DEFAULT_MAX_LOAD_ROWS = 10_000_000
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+def synthesize(df, n_rows, seed=0):
+    """Scale the cleaned dataset to `n_rows` by resampling its rows"""
+    rng = np.random.default_rng(seed)
+    return df[AGGREGATE_COLUMNS].take(rng.integers(0, len(df), size=n_rows)).reset_index(drop=True)
+
+
+def write_synthetic_csv(raw, n_rows, path, seed=0, chunk_rows=1_000_000):
+    """Write `n_rows` raw rows resampled from the real CSV, with fresh ids, to `path`"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows):
+        size = min(chunk_rows, n_rows - start)
+        chunk = raw.take(rng.integers(0, len(raw), size=size)).reset_index(drop=True)
+        chunk['id'] = np.arange(start + 1, start + size + 1)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def legacy_display_columns(df):
+    """add_display_columns as it was: a deep copy of the frame plus mapped label columns
+
+    Kept here so the baseline does not follow later changes to the app (the cleaned frame
+    now carries the labels, and add_display_columns returns it as is).
+    """
+    df_display = df.copy()
+    df_display['heart_disease_label'] = df_display['has_heart_disease'].map({0: 'No Heart Disease', 1: 'Heart Disease'})
+    df_display['exang_label'] = df_display['exang'].map({False: 'No', True: 'Yes'})
+    if df_display['fbs'].dtype in ['int64', 'float64']:
+        df_display['fbs_label'] = df_display['fbs'].map({0: '≤120 mg/dl', 1: '>120 mg/dl'})
+    else:
+        df_display['fbs_label'] = df_display['fbs']
+    return df_display
+
+
+def legacy_aggregates(df):
+    """Per-section aggregation as done before the shared aggregation layer"""
+    results = {}
+    for _ in range(3):  # demographic, clinical and risk sections each copied the frame
+        df_display = legacy_display_columns(df)
+    for column in ['age_group', 'sex', 'cp', 'chol_category', 'exang_label']:
+        counts = df_display.groupby([column, 'heart_disease_label']).size().reset_index(name='count')
+        totals = df_display.groupby(column).size().reset_index(name='total')
+        counts = counts.merge(totals, on=column)
+        counts['percentage'] = (counts['count'] / counts['total'] * 100).round(1)
+        results[column] = counts
+    for column in ['chol_category', 'bp_category', 'fbs', 'cp']:
+        results[f'{column}_risk'] = df.groupby(column)['has_heart_disease'].mean() * 100
+    results['male_rate'] = df[df['sex'] == 'Male']['has_heart_disease'].mean()
+    results['female_rate'] = df[df['sex'] == 'Female']['has_heart_disease'].mean()
+    results['avg_age_disease'] = df[df['has_heart_disease'] == 1]['age'].mean()
+    results['avg_age_no_disease'] = df[df['has_heart_disease'] == 0]['age'].mean()
+    return results
+
+
+def time_call(func, repeat):
+    """Best wall time (seconds) of `repeat` calls"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(func, repeat):
+    """Latency percentiles (ms) over `repeat` calls plus peak traced memory of one more call"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Traced separately so tracemalloc overhead does not leak into the timings
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = {f'p{p}_ms': round(float(np.percentile(timings, p)), 3) for p in PERCENTILES}
+    stats.update({
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'mean_ms': round(float(np.mean(timings)), 3),
+        'runs': repeat,
+        'peak_memory_bytes': int(peak),
+    })
+    return stats
+
+
+def render(figures):
+    """Plotly figures as the dashboard receives them (JSON spec round trip)"""
+    return {name: json.loads(fig.to_json()) for name, fig in figures.items()}
+
+
+def section_stages(df):
+    """Stage name -> callable for the aggregation layer and every dashboard section"""
+    aggregates = app.compute_aggregates(df)
+    facet_codes, rows = app.build_facet_codes(df), np.arange(len(df))
+    association_codes = app.build_association_codes(df)
+    return {
+        'add_display_columns': lambda: app.add_display_columns(df),
+        'compute_aggregates': lambda: app.compute_aggregates(df),
+        'facet_query': lambda: app.facet_query(facet_codes, rows, {'cp': ['asymptomatic'], 'exang': [True]}),
+        'association_matrix': lambda: app.association_matrix(df, association_codes),
+        'create_overview_metrics': lambda: app.create_overview_metrics(aggregates),
+        'create_demographic_analysis': lambda: app.create_demographic_analysis(render(app.build_demographic_figures(aggregates))),
+        'create_clinical_analysis': lambda: app.create_clinical_analysis(render(app.build_clinical_figures(aggregates))),
+        'create_risk_factors_analysis': lambda: app.create_risk_factors_analysis(render(app.build_risk_factors_figures(aggregates))),
+        'create_insights_and_recommendations': lambda: app.create_insights_and_recommendations(aggregates),
+    }
+
+
+def benchmark_scale(raw, base, scale, repeat, max_load_rows, workdir):
+    """Stage results for one dataset scale"""
+    n_rows = len(raw) * scale
+    stages = {}
+
+    if n_rows <= max_load_rows:
+        csv_path = os.path.join(workdir, f'synthetic-{scale}x.csv')
+        write_synthetic_csv(raw, n_rows, csv_path, seed=scale)
+        app.DATA_PATH = csv_path
+        app.COLUMNAR_CACHE_DIR = None  # every call parses and cleans the CSV
+        stages['load_data'] = measure(app.load_data, repeat)
+        df = app.load_data()
+        os.remove(csv_path)
+    else:
+        stages['load_data'] = {'skipped': f'{n_rows:,} rows exceeds --max-load-rows'}
+        df = synthesize(base, n_rows, seed=scale)
+
+    for name, func in section_stages(df).items():
+        stages[name] = measure(func, repeat)
+    return {'scale': scale, 'rows': len(df), 'stages': stages}
+
+
+def run_suite(args):
+    """Benchmark every stage at every scale and write the JSON report"""
+    raw = pd.read_csv(app.DATA_PATH)
+    base = app.load_cleaned_data(app.DATA_PATH)[0]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [benchmark_scale(raw, base, scale, args.repeat, args.max_load_rows, workdir)
+                   for scale in args.scales]
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'repeat': args.repeat,
+        'base_rows': len(raw),
+        'results': results,
+        'process_peak_rss_bytes': max_rss if sys.platform == 'darwin' else max_rss * 1024,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+def compare_legacy(args):
+    """Timing comparison of the shared aggregation layer against per-section groupbys"""
+    df = synthesize(app.load_data(), args.rows)
+    age_range = (int(df['age'].min()), int(df['age'].max()))
+
+    before = time_call(lambda: legacy_aggregates(df), args.repeat)
+    after = time_call(lambda: app.compute_aggregates(df), args.repeat)
+    cube = app.build_count_cube(df)
+    cube_query = time_call(lambda: app.query_count_cube(cube, age_range), args.repeat)
+
+    print(f'rows:                          {len(df):,}')
+    print(f'before (per-section groupbys): {before * 1000:10.1f} ms')
+    print(f'after (compute_aggregates):    {after * 1000:10.1f} ms  ({before / after:.1f}x)')
+    print(f'count cube query:              {cube_query * 1000:10.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=lambda s: [int(x) for x in s.split(',')], default=DEFAULT_SCALES,
+                        help='comma-separated multiples of the real dataset size')
+    parser.add_argument('--repeat', type=int, default=5, help='timed repetitions per stage')
+    parser.add_argument('--max-load-rows', type=int, default=DEFAULT_MAX_LOAD_ROWS,
+                        help='largest synthetic CSV to write and load')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare-legacy', action='store_true',
+                        help='only compare compute_aggregates against the old per-section groupbys')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='dataset size for --compare-legacy')
+    args = parser.parse_args()
+
+    if args.compare_legacy:
+        compare_legacy(args)
+    else:
+        run_suite(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""Export static dashboard reports, one per filter combination
+
+Each report replays the dashboard's own section renderers (create_overview_metrics,
+create_*_analysis, create_insights_and_recommendations) against a recording streamlit
+stub and writes the result as a self-contained HTML page plus a JSON file holding the
+Plotly specs, the headline metrics, the heart disease association ranking and the
+insights text. Combinations are spread over a
+pool of forked workers that share the cleaned data loaded once by the parent.
+
+Run with: python export.py reports/ --genders all --datasets all --age-ranges full,40-60,50-70
+"""
+import argparse
+import functools
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from plotly.offline import get_plotlyjs
+
+import headless
+
+
+app = headless.load_app()
+PAGE_STYLE = app.PAGE_STYLE
+
+# Where report pages load plotly.js from: one shared copy in the output directory,
+# inlined into every page, or the public CDN
+PLOTLY_JS_MODES = ['directory', 'inline', 'cdn']
+PLOTLY_JS_FILE = 'plotly.min.js'
+PLOTLY_CDN_URL = 'https://cdn.plot.ly/plotly-2.35.2.min.js'
+
+# Headline numbers copied from the aggregates into each JSON report
+REPORT_METRICS = ['total', 'heart_disease_count', 'heart_disease_rate', 'avg_age', 'male_count',
+                  'male_disease_rate', 'female_disease_rate', 'avg_age_disease', 'avg_age_no_disease',
+                  'highest_risk_cp', 'highest_risk_cp_rate']
+
+# Cleaned data shared with the forked workers (set by the parent before the pool starts)
+_state = None
+
+
+def _plain(value):
+    """JSON-safe scalar: numpy values unwrapped, NaN as null"""
+    value = app._json_value(value)
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+def markdown_to_html(text):
+    """HTML for the small markdown subset the dashboard writes (paragraphs, bullets, bold)"""
+    blocks, items = [], []
+    for line in textwrap.dedent(text).strip().splitlines():
+        line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html.escape(line.strip()))
+        if line.startswith('- '):
+            items.append(f"<li>{line[2:]}</li>")
+            continue
+        if items:
+            blocks.append(f"<ul>{''.join(items)}</ul>")
+            items = []
+        if line:
+            blocks.append(f"<p>{line}</p>")
+    if items:
+        blocks.append(f"<ul>{''.join(items)}</ul>")
+    return '\n'.join(blocks)
+
+
+def render_elements(elements):
+    """HTML body of recorded streamlit elements (markdown, charts and notices)
+
+    Consecutive metric cards (laid out in st.columns in the app) share one row.
+    """
+    parts, cards = [], []
+    for name, args, kwargs in elements:
+        if name == 'markdown' and kwargs.get('unsafe_allow_html') and 'class="metric-card"' in args[0]:
+            cards.append(args[0])
+            continue
+        if cards:
+            parts.append(f'<div class="report-metrics">{"".join(cards)}</div>')
+            cards = []
+        if name == 'markdown':
+            parts.append(args[0] if kwargs.get('unsafe_allow_html') else markdown_to_html(args[0]))
+        elif name == 'plotly_chart':
+            spec = args[0] if isinstance(args[0], dict) else json.loads(args[0].to_json())
+            div_id = f"figure-{len(parts)}"
+            parts.append(f'<div id="{div_id}" class="report-figure"></div><script>Plotly.newPlot('
+                         f'"{div_id}", {json.dumps(spec["data"])}, {json.dumps(spec["layout"])}, '
+                         f'{{"responsive": true}});</script>')
+        elif name in ('caption', 'info', 'success', 'warning', 'error'):
+            parts.append(f'<div class="report-{name}">{markdown_to_html(str(args[0]))}</div>')
+    if cards:
+        parts.append(f'<div class="report-metrics">{"".join(cards)}</div>')
+    return '\n'.join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def plotly_script(mode):
+    """<script> tag loading plotly.js for a PLOTLY_JS_MODES choice"""
+    if mode == 'inline':
+        return f"<script>{get_plotlyjs()}</script>"
+    return f'<script src="{PLOTLY_JS_FILE if mode == "directory" else PLOTLY_CDN_URL}"></script>'
+
+
+def report_name(view):
+    """File stem of a filter combination, e.g. cleveland_male_40-60"""
+    lo, hi = view['age_range']
+    slug = f"{view['dataset']}_{view['gender']}_{lo}-{hi}".lower()
+    return re.sub(r'[^a-z0-9_-]+', '-', slug)
+
+
+def build_report(view):
+    """Recorded section elements plus the JSON document of one filter combination"""
+    aggregates = app.get_view_aggregates(view)
+    figures = {}
+    with headless.recording() as elements:
+        app.create_overview_metrics(aggregates)
+        for builder, create in [(app.build_demographic_figures, app.create_demographic_analysis),
+                                (app.build_clinical_figures, app.create_clinical_analysis),
+                                (app.build_risk_factors_figures, app.create_risk_factors_analysis)]:
+            section = app.get_section_figures(view, builder)
+            figures.update(section)
+            create(section)
+        for column in app.DISTRIBUTION_COLUMNS:
+            figures[f'distribution_{column}'] = app.get_distribution_figure(view, column)
+            app.create_distribution_analysis(figures[f'distribution_{column}'])
+        associations = app.get_view_associations(view)
+        section = app.get_association_figures(view)
+        figures.update({f'association_{name}': figure for name, figure in section.items()})
+        app.create_association_analysis(section, associations)
+        with headless.recording() as insights:
+            app.create_insights_and_recommendations(aggregates, associations)
+        elements.extend(insights)
+
+    intervals = aggregates.get('intervals', {})
+    document = {
+        'filters': {'dataset': view['dataset'], 'gender': view['gender'], 'age_range': list(view['age_range'])},
+        'metrics': {key: _plain(aggregates[key]) for key in REPORT_METRICS},
+        'intervals': {key: [_plain(bound) for bound in value] for key, value in intervals.items() if key != 'risk'},
+        'associations': [{key: _plain(value) for key, value in row.items()}
+                         for row in associations['outcome'].drop(columns='column').to_dict('records')],
+        'figures': {name: json.loads(figure.to_json()) for name, figure in figures.items()},
+        'insights': '\n'.join(textwrap.dedent(args[0]).strip() for name, args, kwargs in insights
+                              if name == 'markdown' and not kwargs.get('unsafe_allow_html')),
+    }
+    return elements, document
+
+
+def write_report(view, output_dir, plotly_js):
+    """Write <name>.html and <name>.json for one filter combination; returns its index entry"""
+    elements, document = build_report(view)
+    name = report_name(view)
+    filters = document['filters']
+    title = (f"{filters['dataset']} · {filters['gender']} · "
+             f"ages {filters['age_range'][0]}–{filters['age_range'][1]}")
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Heart Disease Report: {html.escape(title)}</title>
+{plotly_script(plotly_js)}
+{PAGE_STYLE}
+<style>.report-metrics {{ display: flex; flex-wrap: wrap; }}</style>
+</head><body>
+<div class="main-header">🫀 Heart Disease Analysis Dashboard</div>
+<p><strong>Filters:</strong> {html.escape(title)}</p>
+{render_elements(elements)}
+</body></html>
+"""
+    with open(os.path.join(output_dir, f"{name}.html"), 'w', encoding='utf-8') as f:
+        f.write(page)
+    with open(os.path.join(output_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+        json.dump(document, f, default=_plain)
+    return {'name': name, 'title': title, 'patients': document['metrics']['total']}
+
+
+def _export_one(view, output_dir, plotly_js):
+    """Worker entry point: the view carries only filters; the data comes from the fork"""
+    return write_report(dict(view, state=_state), output_dir, plotly_js)
+
+
+def export_reports(state, views, output_dir, plotly_js='directory', workers=None):
+    """Write every report (in parallel when possible) plus an index page; returns the entries"""
+    global _state
+    _state = state
+    os.makedirs(output_dir, exist_ok=True)
+    if plotly_js == 'directory':
+        with open(os.path.join(output_dir, PLOTLY_JS_FILE), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+
+    workers = min(workers or os.cpu_count() or 1, len(views))
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        entries = [_export_one(view, output_dir, plotly_js) for view in views]
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            entries = list(executor.map(_export_one, views, itertools.repeat(output_dir),
+                                        itertools.repeat(plotly_js),
+                                        chunksize=max(1, len(views) // (workers * 4))))
+
+    rows = '\n'.join(f'<li><a href="{entry["name"]}.html">{html.escape(entry["title"])}</a> '
+                     f'({entry["patients"]:,} patients, <a href="{entry["name"]}.json">JSON</a>)</li>'
+                     for entry in entries)
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Heart Disease Reports</title>'
+                f'</head><body>\n<h1>Heart Disease Reports</h1>\n<ul>\n{rows}\n</ul>\n</body></html>\n')
+    return entries
+
+
+def parse_choices(value, options):
+    """'all' -> 'All' plus every option; otherwise the comma-separated values given"""
+    if value == 'all':
+        return ['All'] + list(options)
+    return [choice.strip() for choice in value.split(',')]
+
+
+def parse_age_ranges(value, full_range):
+    """Comma-separated 'lo-hi' ranges; 'full' is the whole age range of the data"""
+    ranges = []
+    for part in value.split(','):
+        part = part.strip()
+        ranges.append(tuple(full_range) if part == 'full' else tuple(int(x) for x in part.split('-')))
+    return ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir', help='directory to write the reports and index.html to')
+    parser.add_argument('--datasets', default='all', help="comma-separated sites, 'All' for every site, or 'all' for each plus 'All'")
+    parser.add_argument('--genders', default='all', help="comma-separated sexes, 'All', or 'all' for each plus 'All'")
+    parser.add_argument('--age-ranges', default='full', help="comma-separated lo-hi age ranges ('full' for every age)")
+    parser.add_argument('--plotly-js', choices=PLOTLY_JS_MODES, default='directory',
+                        help='load plotly.js from one shared file, inline it per page, or use the CDN')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    args = parser.parse_args()
+
+    state = app.get_data_store().state
+    views = [{'age_range': age_range, 'gender': gender, 'dataset': dataset}
+             for age_range in parse_age_ranges(args.age_ranges, app.state_age_bounds(state))
+             for gender in parse_choices(args.genders, app.state_options(state, 'sex'))
+             for dataset in parse_choices(args.datasets, app.state_options(state, 'dataset'))]
+
+    start = time.perf_counter()
+    export_reports(state, views, args.output_dir, args.plotly_js, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"wrote {len(views):,} reports to {args.output_dir} in {elapsed:.1f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
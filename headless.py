@@ -0,0 +1,107 @@
+"""Import the dashboard module without a Streamlit server
+
+Streamlit is replaced by a no-op stub before `app` is imported, so its data, aggregation
+and figure functions can run from command-line tools. Inside `recording()` the stub also
+collects every element the app emits, so section renderers can be replayed elsewhere.
+"""
+import functools
+import inspect
+import sys
+import threading
+import types
+from contextlib import contextmanager
+
+
+# Elements collected by the innermost active recording() block (None outside one)
+_recording = None
+
+
+@contextmanager
+def recording():
+    """Collect (element name, args, kwargs) of every streamlit call made inside the block"""
+    global _recording
+    previous, _recording = _recording, []
+    try:
+        yield _recording
+    finally:
+        _recording = previous
+
+
+class _Element:
+    """No-op stand-in for any streamlit element, container or widget"""
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        if _recording is not None and self.name:
+            _recording.append((self.name, args, kwargs))
+        return self
+
+    def __getattr__(self, name):
+        return _Element(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _passthrough_cache(func=None, **kwargs):
+    """st.cache_data / st.fragment without caching, with or without arguments"""
+    if func is None:
+        return _passthrough_cache
+    func.clear = lambda *args, **kwargs: None
+    return func
+
+
+def _resource_cache(func=None, **kwargs):
+    """st.cache_resource: one shared result per argument values, as in a server process
+
+    As in Streamlit, arguments whose names start with an underscore are left out of the
+    key, so e.g. one ResultCache serves every call of a process (or of a forked worker).
+    """
+    if func is None:
+        return _resource_cache
+    signature = inspect.signature(func)
+    results = {}
+    lock = threading.RLock()
+
+    @functools.wraps(func)
+    def cached(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple((name, value) for name, value in bound.arguments.items() if not name.startswith('_'))
+        with lock:
+            if key not in results:
+                results[key] = func(*args, **kwargs)
+            return results[key]
+
+    cached.clear = lambda *args, **kwargs: results.clear()
+    return cached
+
+
+def _containers(spec, *args, **kwargs):
+    """st.columns / st.tabs: one no-op container per requested slot"""
+    return [_Element() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+
+def streamlit_stub():
+    """Module that satisfies every streamlit call the app makes, doing nothing but record"""
+    stub = types.ModuleType('streamlit')
+    stub.__getattr__ = _Element
+    stub.cache_data = _passthrough_cache
+    stub.cache_resource = _resource_cache
+    stub.fragment = _passthrough_cache
+    stub.columns = stub.tabs = _containers
+    stub.session_state = {}
+    stub.sidebar = _Element()
+    return stub
+
+
+def load_app():
+    """The dashboard module, imported against the streamlit stub"""
+    sys.modules['streamlit'] = streamlit_stub()
+    import app
+    return app
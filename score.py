@@ -0,0 +1,67 @@
+"""Score a CSV of new patients with the dashboard's heart disease risk model
+
+Rows are streamed in chunks through the same cleaning rules (and imputation values) as the
+training data, and `id,risk_score` is written out chunk by chunk, so memory stays bounded
+however large the input is. The model is trained on the dashboard dataset unless a saved
+one is given.
+
+Run with: python score.py new_patients.csv scores.csv [--model risk_model.json]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import headless
+
+
+app = headless.load_app()
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def load_model(args):
+    """Saved model from --model, else one trained on the dashboard dataset"""
+    if args.model:
+        return app.read_risk_model(args.model)
+    df, statistics = app.load_cleaned_data(app.DATA_PATH)
+    model = app.train_risk_model(df, statistics['fill_values'])
+    if args.save_model:
+        app.write_risk_model(model, args.save_model)
+    return model
+
+
+def score_csv(input_path, output_path, model, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream `input_path` through the model into `output_path`; returns the row count"""
+    if not model['fill_values']:
+        raise ValueError("model has no imputation values; train it on load_cleaned_data output")
+    n_rows = 0
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        ids = chunk['id'].to_numpy() if 'id' in chunk.columns else np.arange(n_rows, n_rows + len(chunk))
+        scores = app.score_raw_patients(chunk, model)
+        pd.DataFrame({'id': ids, 'risk_score': scores.round(6)}).to_csv(
+            output_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0, index=False)
+        n_rows += len(chunk)
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='CSV of patients in the dashboard dataset layout (num optional)')
+    parser.add_argument('output', help='CSV to write id,risk_score to')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows cleaned and scored at a time')
+    parser.add_argument('--model', help='JSON model saved with --save-model (default: train on the dashboard data)')
+    parser.add_argument('--save-model', help='write the trained model here as JSON')
+    args = parser.parse_args()
+
+    model = load_model(args)
+    start = time.perf_counter()
+    n_rows = score_csv(args.input, args.output, model, args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"scored {n_rows:,} rows in {elapsed:.1f} s ({n_rows / elapsed * 60:,.0f} rows/min)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
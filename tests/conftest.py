@@ -0,0 +1,25 @@
+"""Shared fixtures: the dashboard module imported against the headless streamlit stub"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import headless  # noqa: E402
+
+app = headless.load_app()
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    """The app module, with its on-disk cache in a temporary directory"""
+    monkeypatch.setattr(app, 'COLUMNAR_CACHE_DIR', str(tmp_path / 'cache'))
+    return app
+
+
+@pytest.fixture
+def source_csv():
+    """Path of the real dataset shipped with the dashboard"""
+    return os.path.join(ROOT, app.DATA_PATH)
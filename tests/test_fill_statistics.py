@@ -0,0 +1,59 @@
+"""Mergeable imputation statistics against the pandas medians and modes they stand in for"""
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_sketch_median_is_exact_before_compaction(dashboard):
+    values = pd.Series(np.random.default_rng(1).normal(240, 50, 1500).round(1))
+    values[::7] = np.nan
+    sketch = dashboard.QuantileSketch()
+    for chunk in np.array_split(values.to_numpy(), 4):
+        part = dashboard.QuantileSketch()
+        part.update(chunk)
+        sketch.merge(part)
+    assert sketch.count == values.count()
+    assert sketch.median() == pytest.approx(values.median())
+
+
+@pytest.mark.parametrize('distribution', ['normal', 'lognormal', 'integers'])
+def test_merged_sketch_median_rank_error(dashboard, distribution):
+    rng = np.random.default_rng(2)
+    values = {'normal': rng.normal(130, 18, 300_000),
+              'lognormal': rng.lognormal(0, 1, 300_000),
+              'integers': rng.integers(80, 200, 300_000).astype(float)}[distribution]
+    sketch = dashboard.QuantileSketch()
+    for chunk in np.array_split(values, 30):
+        part = dashboard.QuantileSketch()
+        part.update(chunk)
+        sketch.merge(part)
+    estimate = sketch.median()
+    # Rank error: the estimate sits within 1% of the middle of the sorted values
+    below, at_most = np.mean(values < estimate), np.mean(values <= estimate)
+    assert below - 0.01 <= 0.5 <= at_most + 0.01
+    assert dashboard.QuantileSketch.from_dict(sketch.to_dict()).median() == estimate
+
+
+def test_counter_mode_matches_pandas_including_ties(dashboard):
+    series = pd.Series(['typical angina', 'asymptomatic', 'non-anginal', 'asymptomatic',
+                        'non-anginal', None, 'atypical angina'])
+    counter = dashboard.FrequencyCounter()
+    for chunk in (series[:3], series[3:]):
+        part = dashboard.FrequencyCounter()
+        part.update(chunk)
+        counter.merge(part)
+    assert counter.mode() == series.mode()[0] == 'asymptomatic'
+    assert dashboard.FrequencyCounter().mode(default='none') == 'none'
+
+    flags = pd.Series([True, False, False, True, np.nan], dtype=object)
+    counter = dashboard.FrequencyCounter()
+    counter.update(flags)
+    assert counter.mode() == flags.mode()[0]
+
+
+def test_streamed_fill_values_match_pandas(dashboard, source_csv):
+    expected = dashboard.compute_fill_values(dashboard.prepare_raw_data(pd.read_csv(source_csv)))
+    streamed = dashboard.scan_fill_statistics(source_csv, chunksize=100)
+    assert streamed['fill_values'].keys() == expected.keys()
+    for column, value in expected.items():
+        assert streamed['fill_values'][column] == pytest.approx(value), column
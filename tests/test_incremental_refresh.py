@@ -0,0 +1,190 @@
+"""Rows appended to the source CSV, folded in by DataStore.refresh, give the state of a full reload"""
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# State entries that must match a fresh DataStore (versions, timestamps and the content
+# digest, which an append leaves unset, legitimately differ); the rows, filter index and
+# facet codes are compared through logical_state
+COMPARED_KEYS = ['n_rows', 'fill_values', 'column_ranges', 'cube', 'signature', 'offset', 'tail_digest']
+
+
+def assert_same(actual, expected, path='state'):
+    """Recursive equality of dicts, sequences, arrays and frames, naming the first difference"""
+    if isinstance(expected, pd.DataFrame):
+        # (copies, as a frame read back from its columnar artifact holds memory maps)
+        pd.testing.assert_frame_equal(actual.copy(), expected.copy(), obj=path)
+    elif isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same(actual[key], expected[key], f"{path}[{key!r}]")
+    elif isinstance(expected, np.ndarray):
+        np.testing.assert_array_equal(actual, expected, err_msg=path)
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same(a, e, f"{path}[{i}]")
+    elif isinstance(expected, float) and np.isnan(expected):
+        assert np.isnan(actual), path
+    else:
+        assert actual == expected, path
+
+
+def logical_state(dashboard, state):
+    """Rows, filter index and facet codes of a state, however chunked and with whatever spare capacity"""
+    n_rows = state['n_rows']
+    return {
+        'frame': dashboard.state_frame(state),
+        'age_run': dashboard.merge_age_runs(state['index']['runs']),
+        'bitmaps': {column: {value: np.unpackbits(bitmap, count=n_rows) for value, bitmap in bitmaps.items()}
+                    for column, bitmaps in state['index']['bitmaps'].items()},
+        'facets': dict(state['facets'], codes=state['facets']['codes'][:n_rows]),
+    }
+
+
+def assert_same_data(dashboard, state, fresh):
+    for key in COMPARED_KEYS:
+        assert_same(state[key], fresh[key], key)
+    assert_same(logical_state(dashboard, state), logical_state(dashboard, fresh))
+
+
+def assert_matches_full_reload(dashboard, store):
+    fresh = dashboard.DataStore(store.csv_path)
+    assert_same_data(dashboard, store.state, fresh.state)
+    for col, sketch in fresh.state['statistics']['sketches'].items():
+        assert store.state['statistics']['sketches'][col].median() == pytest.approx(sketch.median()), col
+    for col, counter in fresh.state['statistics']['counters'].items():
+        assert store.state['statistics']['counters'][col].mode() == counter.mode(), col
+    return fresh
+
+
+def append_rows(path, rows, first_id):
+    """Append raw rows (with fresh ids) to a CSV; returns the next free id"""
+    rows = rows.assign(id=np.arange(first_id, first_id + len(rows)))
+    rows.to_csv(path, mode='a', header=False, index=False)
+    return first_id + len(rows)
+
+
+@pytest.fixture
+def source(tmp_path, source_csv):
+    """A copy of the dataset that the tests append to, and its raw rows"""
+    path = tmp_path / 'patients.csv'
+    shutil.copyfile(source_csv, path)
+    return str(path), pd.read_csv(path)
+
+
+def test_append_without_drift_matches_full_reload(dashboard, source):
+    path, raw = source
+    store = dashboard.DataStore(path)
+    fill_values = dict(store.state['fill_values'])
+
+    # Every row once more: medians and modes stay put, so the rows are folded in
+    append_rows(path, raw, raw['id'].max() + 1)
+    assert store.refresh() == 'appended'
+    assert store.state['n_rows'] == 2 * len(raw)
+
+    fresh = assert_matches_full_reload(dashboard, store)
+    assert not dashboard._imputation_drift(fill_values, fresh.state['statistics'])
+    assert store.refresh() == 'unchanged'
+
+
+def test_partial_line_waits_for_its_newline(dashboard, source):
+    path, raw = source
+    store = dashboard.DataStore(path)
+
+    # Every other row first (representative enough to leave the imputation values alone),
+    # then a line cut halfway, its remainder and the rest of the rows
+    first, rest = raw.iloc[::2], raw.iloc[1::2]
+    next_id = append_rows(path, first, raw['id'].max() + 1)
+    line = rest.iloc[[0]].assign(id=next_id).to_csv(header=False, index=False)
+    with open(path, 'a') as f:
+        f.write(line[:len(line) // 2])
+    assert store.refresh() == 'appended'
+    assert store.state['n_rows'] == len(raw) + len(first)
+
+    with open(path, 'a') as f:
+        f.write(line[len(line) // 2:])
+    append_rows(path, rest.iloc[1:], next_id + 1)
+    assert store.refresh() == 'appended'
+    assert store.state['n_rows'] == 2 * len(raw)
+    assert_matches_full_reload(dashboard, store)
+
+
+def test_appends_leave_the_loaded_rows_alone(dashboard, source, monkeypatch):
+    path, raw = source
+    # Four copies loaded, a fifth appended in four parts: the medians and modes stay put
+    next_id = raw['id'].max() + 1
+    for _ in range(3):
+        next_id = append_rows(path, raw, next_id)
+    store = dashboard.DataStore(path)
+    loaded = store.state['frames'][0]
+
+    # Row counts handed to everything that builds over (or copies) a whole frame
+    sizes = []
+    def spy(func):
+        def spied(frames, *args, **kwargs):
+            sizes.append((func.__name__, sum(map(len, frames)) if isinstance(frames, list) else len(frames)))
+            return func(frames, *args, **kwargs)
+        return spied
+    for name in ['concat_cleaned_frames', 'build_count_cube', 'build_filter_index', 'build_facet_codes',
+                 'build_association_codes']:
+        monkeypatch.setattr(dashboard, name, spy(getattr(dashboard, name)))
+
+    for i in range(4):
+        rows = raw.iloc[i::4]
+        previous = store.state
+        next_id = append_rows(path, rows, next_id)
+        assert store.refresh() == 'appended'
+        if i:
+            # Past the first append's growth, new bits and codes go into the spare capacity
+            for name in ('Male', 'Female'):
+                assert np.shares_memory(store.state['index']['bitmaps']['sex'][name],
+                                        previous['index']['bitmaps']['sex'][name])
+            assert np.shares_memory(store.state['facets']['codes'], previous['facets']['codes'])
+
+    # The loaded frame is never copied; only chunks of appended rows were merged
+    assert store.state['frames'][0] is loaded
+    assert len(store.state['frames']) > 1
+    assert sizes and all(size <= len(raw) for _, size in sizes), sizes
+    # (Sketches merged part by part may place the median a little differently, so they
+    # are not compared here)
+    monkeypatch.undo()
+    assert_same_data(dashboard, store.state, dashboard.DataStore(path).state)
+
+
+def test_drifted_medians_trigger_the_same_reload(dashboard, source):
+    path, raw = source
+    store = dashboard.DataStore(path)
+    fill_values = dict(store.state['fill_values'])
+
+    # Markedly higher cholesterol moves its median past IMPUTATION_DRIFT_TOLERANCE
+    append_rows(path, raw.assign(chol=raw['chol'] + 150), raw['id'].max() + 1)
+    assert store.refresh() == 'reloaded'
+    assert store.state['last_update'] == 'full reload (imputation drift in chol)'
+
+    fresh = assert_matches_full_reload(dashboard, store)
+    assert set(dashboard._imputation_drift(fill_values, fresh.state['statistics'])) == {'chol'}
+
+
+def test_rewritten_source_is_reloaded(dashboard, source):
+    path, raw = source
+    store = dashboard.DataStore(path)
+    raw.iloc[::-1].to_csv(path, index=False)
+    assert store.refresh() == 'reloaded'
+    assert_matches_full_reload(dashboard, store)
+
+
+def test_facet_codes_extend_only_over_known_combinations(dashboard, source_csv):
+    df = dashboard.load_cleaned_data(source_csv)[0]
+    facets = dashboard.build_facet_codes(df)
+
+    # Rows whose combinations all occur already are coded like a full build
+    new_rows = df.sample(200, random_state=0).reset_index(drop=True)
+    extended = dashboard.extend_facet_codes(facets, new_rows, len(df))
+    extended['codes'] = extended['codes'][:len(df) + len(new_rows)]
+    assert_same(extended, dashboard.build_facet_codes(dashboard.concat_cleaned_frames([df, new_rows])))
+
+    # A new label changes the combination table: the caller rebuilds
+    assert dashboard.extend_facet_codes(facets, new_rows.assign(cp='unknown'), len(df)) is None